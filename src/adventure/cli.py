@@ -1,5 +1,7 @@
 import argparse
+import time
 from adventure.engine.loop import start_game, load_game
+from adventure.engine import metrics
 
 def main():
     ap = argparse.ArgumentParser(prog="infoprox")
@@ -20,18 +22,171 @@ def main():
         default=15,
         help="Number of rooms (clamped 10–20, default 15)",
     )
+    play.add_argument("--autosave", default=None, metavar="FILE",
+                      help="Save to FILE after every command, from a background thread")
+    play.add_argument("--campaign", action="store_true",
+                      help="Chain worlds: opening the vault moves on to a new world, score carried over")
+    play.add_argument("--prefetch", type=int, default=1,
+                      help="With --campaign: worlds generated ahead in the background (0 = on demand)")
+    play.add_argument("--ticks", action="store_true",
+                      help="Timed world events: doors relock, notes wander, ambient messages")
+    _add_metrics_args(play)
 
     # load subcommand
-    loadp = sub.add_parser("load", help="Load from a save file")
-    loadp.add_argument("file")
+    loadp = sub.add_parser("load", help="Load from a save file or slot")
+    loadp.add_argument("file", nargs="?", default=None)
+    loadp.add_argument("--slot", default=None, help="Load a named save slot instead of a file")
+    loadp.add_argument("--dir", default=None, help="Save slot directory (default: $INFOPROX_SAVES or ./saves)")
+    loadp.add_argument("--autosave", default=None, metavar="FILE",
+                       help="Save to FILE after every command, from a background thread")
+    loadp.add_argument("--ticks", action="store_true",
+                       help="Timed world events: doors relock, notes wander, ambient messages")
+    _add_metrics_args(loadp)
+
+    # saves subcommand
+    sv = sub.add_parser("saves", help="List or prune named save slots")
+    sv.add_argument("action", choices=["list", "prune", "delete"])
+    sv.add_argument("slot", nargs="?", default=None, help="Slot to delete")
+    sv.add_argument("--dir", default=None, help="Save slot directory (default: $INFOPROX_SAVES or ./saves)")
+    sv.add_argument("--keep", type=int, default=None, help="prune: keep only the newest N slots")
+    sv.add_argument("--older-than", type=float, default=None, help="prune: delete slots older than N days")
+    sv.add_argument("--limit", type=int, default=50, help="list: show at most N slots (default 50)")
+
+    # loadtest subcommand
+    lt = sub.add_parser("loadtest", help="Simulate bot players and report turn latency")
+    lt.add_argument(
+        "--sessions",
+        default="1,10,100",
+        help="Comma-separated concurrent session counts to run, in order (default: 1,10,100)",
+    )
+    lt.add_argument("--turns", type=int, default=200, help="Commands per session (default 200)")
+    lt.add_argument("--seed", type=int, default=0, help="Base seed for worlds and bots")
+    lt.add_argument("--rooms", type=int, default=15, help="Rooms per world (default 15)")
+    lt.add_argument("--theme", choices=["fantasy", "scifi", "horror"], default=None,
+                    help="World theme (default: mixed)")
+    lt.add_argument("--mix", default="walker=2,solver=1,spammer=1",
+                    help="Bot weights, e.g. walker=2,solver=1,spammer=1")
+    lt.add_argument("--no-memory", action="store_true", help="Skip the per-session memory pass")
+
+    # serve subcommand
+    sv_ = sub.add_parser("serve", help="Serve many sessions over a machine-readable protocol")
+    sv_.add_argument("--stdio-jsonl", action="store_true",
+                     help="JSON request per line on stdin, JSON response per line on stdout")
+    sv_.add_argument("--port", type=int, default=None,
+                     help="Serve the same protocol on 127.0.0.1:PORT as a cluster node (0 = any free port)")
+    sv_.add_argument("--sessions-dir", default="sessions", help="Where idle sessions hibernate")
+    sv_.add_argument("--idle", type=float, default=600.0, help="Seconds before an idle session hibernates")
+    sv_.add_argument("--max-resident", type=int, default=1000, help="Sessions kept in memory at most")
+    sv_.add_argument("--fair", action="store_true",
+                     help="Queue requests per session and schedule them round-robin by cost")
+    sv_.add_argument("--queue-limit", type=int, default=64,
+                     help="With --fair: queued commands per session before backpressure (default 64)")
+    _add_metrics_args(sv_)
+
+    # fuzz subcommand
+    fz = sub.add_parser("fuzz", help="Check generated worlds for structural invariants on all cores")
+    fz.add_argument("--seeds", default="0:100000", help="Seed range, A:B (B exclusive) or A-B (default 0:100000)")
+    fz.add_argument("--themes", default=None, help="Comma-separated themes (default: all)")
+    fz.add_argument("--sizes", default="8-15", help="Room counts, A-B or A:B (default 8-15)")
+    fz.add_argument("--workers", type=int, default=None, help="Processes (default: one per core)")
+    fz.add_argument("--chunk", type=int, default=200, help="Seeds per work item (default 200)")
+    fz.add_argument("--shrink-limit", type=int, default=10_000,
+                    help="Seeds below this are searched when shrinking a failure (default 10000)")
+
+    # cluster subcommand
+    cl = sub.add_parser("cluster", help="Route sessions over several local engine nodes")
+    cl.add_argument("--nodes", type=int, default=3, help="Node processes to start (default 3)")
+    cl.add_argument("--sessions-dir", default="sessions", help="Each node hibernates under DIR/<node>")
+    cl.add_argument("--vnodes", type=int, default=64, help="Hash ring points per node (default 64)")
+    cl.add_argument("--idle", type=float, default=600.0, help="Seconds before an idle session hibernates")
+    cl.add_argument("--max-resident", type=int, default=1000, help="Sessions kept in memory per node")
+    _add_metrics_args(cl)
 
     args = ap.parse_args()
+    _start_metrics(args)
 
     if args.cmd == "load":
-        load_game(args.file)
+        if not args.file and not args.slot:
+            ap.error("load needs a save file or --slot NAME")
+        try:
+            load_game(args.file, slot=args.slot, saves_dir=args.dir, autosave=args.autosave,
+                      ticks=args.ticks)
+        except KeyError:
+            ap.error(f"no save slot named {args.slot!r}")
+    elif args.cmd == "serve":
+        from adventure import serve
+        if not args.stdio_jsonl and args.port is None:
+            ap.error("serve needs --stdio-jsonl or --port")
+        serve.main(args.sessions_dir, idle_seconds=args.idle, max_resident=args.max_resident,
+                   fair=args.fair, queue_limit=args.queue_limit, port=args.port)
+    elif args.cmd == "fuzz":
+        from adventure import fuzz
+        themes = [t for t in args.themes.split(",") if t] if args.themes else None
+        try:
+            failures = fuzz.main(fuzz.parse_range(args.seeds), themes=themes,
+                                 sizes=fuzz.parse_range(args.sizes), workers=args.workers,
+                                 chunk=max(1, args.chunk), shrink_limit=args.shrink_limit)
+        except ValueError as e:
+            ap.error(str(e))
+        raise SystemExit(1 if failures else 0)
+    elif args.cmd == "cluster":
+        from adventure import cluster
+        cluster.main(args.nodes, args.sessions_dir, vnodes=args.vnodes, idle_seconds=args.idle,
+                     max_resident=args.max_resident)
+    elif args.cmd == "saves":
+        _saves(ap, args)
+    elif args.cmd == "loadtest":
+        from adventure import loadtest
+        try:
+            mix = loadtest.parse_mix(args.mix)
+        except ValueError as e:
+            ap.error(f"--mix: {e}")
+        levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+        loadtest.main(levels, turns=args.turns, seed=args.seed, rooms=args.rooms,
+                      theme=args.theme, mix=mix, memory=not args.no_memory)
     else:
         rooms = max(10, min(20, int(args.rooms or 15)))
-        start_game(seed=args.seed, theme=args.theme, rooms=rooms)
+        if getattr(args, "campaign", False):
+            from adventure.engine.campaign import start_campaign
+            start_campaign(seed=args.seed, theme=args.theme, rooms=rooms,
+                           prefetch=args.prefetch, autosave=args.autosave, ticks=args.ticks)
+        else:
+            start_game(seed=args.seed, theme=args.theme, rooms=rooms, autosave=args.autosave,
+                       ticks=args.ticks)
+
+def _saves(ap, args):
+    from adventure.engine.slots import SlotManager, DEFAULT_DIR
+    mgr = SlotManager(args.dir or DEFAULT_DIR)
+    if args.action == "list":
+        print(f"{'slot':<24} {'theme':<8} {'seed':>8} {'rooms':>5} {'score':>5} {'turns':>6}  saved")
+        for e in mgr.list()[:max(0, args.limit)]:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["time"]))
+            print(f"{e['slot']:<24} {e['theme']:<8} {e['seed']:>8} {e['n_rooms']:>5} "
+                  f"{e['score']:>5} {e['turns']:>6}  {when}")
+        if len(mgr) > args.limit:
+            print(f"... {len(mgr) - args.limit} more")
+    elif args.action == "delete":
+        if not args.slot:
+            ap.error("saves delete needs a slot name")
+        mgr.delete(args.slot)
+    else:
+        if args.keep is None and args.older_than is None:
+            ap.error("saves prune needs --keep and/or --older-than")
+        older = args.older_than * 86400 if args.older_than is not None else None
+        gone = mgr.prune(keep=args.keep, older_than=older)
+        print(f"Deleted {len(gone)} slot(s); {len(mgr)} left.")
+
+def _add_metrics_args(p):
+    p.add_argument("--metrics-file", default=None,
+                   help="Rewrite Prometheus-format metrics to this file every few seconds")
+    p.add_argument("--metrics-port", type=int, default=None,
+                   help="Serve Prometheus-format metrics on 127.0.0.1:PORT/metrics")
+
+def _start_metrics(args):
+    if getattr(args, "metrics_file", None):
+        metrics.start_textfile_writer(args.metrics_file)
+    if getattr(args, "metrics_port", None):
+        metrics.serve(args.metrics_port)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,273 @@
+"""
+Sessions spread over several engine processes ("nodes") behind one router.
+
+Each node is `infoprox serve --port 0`: a `SessionManager` speaking the
+JSON-lines protocol of `adventure.serve` on a local TCP socket. The router
+places every session on a node by consistent hashing of its id: each node
+owns `vnodes` points on a hash ring and a session belongs to the first
+point at or after its own hash. Adding a node therefore only takes over the
+arcs in front of its points (about 1/n of sessions); removing one hands its
+arcs to the next points along.
+
+When the ring changes, the sessions whose owner changed are moved live:
+the router asks the old node to "export" the session (a compact
+`snapshot_state` dict, which also drops it there) and sends the snapshot to
+the new node. Clients see no difference apart from the extra hop.
+
+    infoprox cluster --nodes 3
+    {"session": "p1", "seed": 5, "cmd": "look"}
+    {"cluster": "add"}                     -> {"cluster": "add", "node": "n4", "moved": 7}
+    {"cluster": "remove", "node": "n2"}    -> {"cluster": "remove", "node": "n2", "moved": 9}
+    {"cluster": "status"}                  -> {"cluster": "status", "nodes": {"n1": 12, ...}}
+
+The router only knows the sessions it has routed since it started; with the
+same node names, sessions hibernated by an earlier run are found again
+because they hash to the same node.
+"""
+import bisect
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+
+from adventure.engine import metrics
+from adventure.serve import _more_input, _write
+
+MOVED = metrics.REGISTRY.counter("infoprox_cluster_sessions_moved_total",
+                                 "Sessions moved between nodes after the ring changed.")
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes=(), vnodes=64):
+        self.vnodes = vnodes
+        self.points = []  # sorted hashes
+        self.owners = []  # node name per point
+        for node in nodes:
+            self.add(node)
+
+    def __contains__(self, node):
+        return node in self.owners
+
+    def __len__(self):
+        return len(set(self.owners))
+
+    def add(self, node):
+        for i in range(self.vnodes):
+            h = _hash(f"{node}#{i}")
+            at = bisect.bisect_left(self.points, h)
+            self.points.insert(at, h)
+            self.owners.insert(at, node)
+
+    def remove(self, node):
+        keep = [(h, n) for h, n in zip(self.points, self.owners) if n != node]
+        self.points = [h for h, _ in keep]
+        self.owners = [n for _, n in keep]
+
+    def node_for(self, key):
+        if not self.points:
+            raise LookupError("the ring has no nodes")
+        at = bisect.bisect_left(self.points, _hash(key))
+        return self.owners[at % len(self.points)]
+
+
+class NodeClient:
+    """One connection to a node; requests are answered strictly in order."""
+
+    def __init__(self, address, proc=None):
+        self.address = address
+        self.proc = proc
+        self.sock = socket.create_connection(address)
+        self.rfile = self.sock.makefile("rb")
+        self.wfile = self.sock.makefile("wb")
+
+    def call(self, req):
+        _write(self.wfile, req)
+        self.wfile.flush()
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError(f"node {self.address[0]}:{self.address[1]} went away")
+        return json.loads(line)
+
+    def close(self):
+        """Disconnect; a node we spawned then hibernates its sessions and exits."""
+        for f in (self.wfile, self.rfile, self.sock):
+            f.close()
+        if self.proc is not None:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=30)
+
+
+def spawn_node(directory, idle_seconds=600.0, max_resident=1000):
+    """Start `infoprox serve --port 0` as a child process and connect to it."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "adventure.cli", "serve", "--port", "0", "--sessions-dir", directory,
+         "--idle", str(idle_seconds), "--max-resident", str(max_resident)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    line = proc.stdout.readline().decode().split()
+    if len(line) != 2 or line[0] != "listening":
+        proc.kill()
+        raise RuntimeError(f"node for {directory} did not start")
+    host, port = line[1].rsplit(":", 1)
+    return NodeClient((host, int(port)), proc)
+
+
+class Router:
+    def __init__(self, vnodes=64):
+        self.ring = HashRing(vnodes=vnodes)
+        self.nodes = {}  # name -> NodeClient
+        self.owner = {}  # sid -> name of the node holding it
+
+    def add_node(self, name, client) -> int:
+        """Put `client` on the ring; returns sessions moved onto it."""
+        self.nodes[name] = client
+        self.ring.add(name)
+        return self.rebalance()
+
+    def remove_node(self, name) -> int:
+        """
+        Move `name`'s sessions to their new owners, then disconnect it; returns
+        sessions moved. If a move fails the node goes back on the ring and
+        keeps the sessions not yet moved.
+        """
+        self.ring.remove(name)
+        try:
+            moved = self.rebalance() if self.ring.points else 0
+        except BaseException:
+            self.ring.add(name)
+            raise
+        self.nodes.pop(name).close()
+        self.owner = {sid: n for sid, n in self.owner.items() if n != name}
+        return moved
+
+    def rebalance(self) -> int:
+        moved = 0
+        for sid, cur in list(self.owner.items()):
+            want = self.ring.node_for(sid)
+            if want != cur:
+                self.migrate(sid, cur, want)
+                moved += 1
+        return moved
+
+    def migrate(self, sid, src, dst):
+        node = self.nodes.get(src)
+        snap = node.call({"session": sid, "export": True}).get("snapshot") if node else None
+        if snap is None:
+            self.owner.pop(sid, None)  # gone on its node (e.g. quit)
+            return
+        try:
+            resp = self.nodes[dst].call({"session": sid, "snapshot": snap})
+            if "error" in resp:
+                raise RuntimeError(f"node {dst} refused session {sid}: {resp['error']}")
+        except BaseException:
+            node.call({"session": sid, "snapshot": snap})  # hand it back rather than lose it
+            raise
+        self.owner[sid] = dst
+        MOVED.inc()
+
+    def request(self, req):
+        """Forward one client request to the session's node; returns the node's answer."""
+        sid = req.get("session") if isinstance(req, dict) else None
+        if not isinstance(sid, str):
+            return {"error": "request needs a \"session\" string"}
+        try:
+            node = self.ring.node_for(sid)
+        except LookupError as e:
+            return {"error": str(e)}
+        cur = self.owner.get(sid)
+        if cur is not None and cur != node:
+            self.migrate(sid, cur, node)
+        resp = self.nodes[node].call(req)
+        if req.get("close") or req.get("export") or resp.get("state", {}).get("over"):
+            self.owner.pop(sid, None)
+        elif "error" not in resp:
+            self.owner[sid] = node
+        return resp
+
+    def status(self):
+        counts = {name: 0 for name in self.nodes}
+        for name in self.owner.values():
+            counts[name] += 1
+        return counts
+
+    def close(self):
+        for name in list(self.nodes):
+            self.nodes.pop(name).close()
+        self.ring = HashRing(vnodes=self.ring.vnodes)
+
+
+def serve_router(router, spawn, inp=None, out=None):
+    """
+    JSON lines on `inp`/`out` like `serve_stdio`, routed to nodes. `spawn(name)`
+    returns a `NodeClient` for {"cluster": "add"}.
+    """
+    inp = inp or sys.stdin.buffer
+    out = out or sys.stdout.buffer
+    n = 0
+    for line in inp:
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+            if isinstance(req, dict) and "cluster" in req:
+                resp = _control(router, spawn, req)
+            else:
+                resp = router.request(req)
+        except ValueError as e:
+            resp = {"error": f"bad request: {e}"}
+        except (OSError, ConnectionError) as e:
+            resp = {"error": f"node failed: {e}"}
+        except Exception as e:
+            resp = {"error": f"{type(e).__name__}: {e}"}
+        _write(out, resp)
+        n += 1
+        if not _more_input(inp):
+            out.flush()
+    out.flush()
+    return n
+
+
+def _control(router, spawn, req):
+    op = req["cluster"]
+    if op == "status":
+        return {"cluster": op, "nodes": router.status()}
+    if op == "add":
+        name = req.get("node") or _next_name(router)
+        if name in router.nodes:
+            return {"cluster": op, "error": f"node {name} already exists"}
+        return {"cluster": op, "node": name, "moved": router.add_node(name, spawn(name))}
+    if op == "remove":
+        name = req.get("node")
+        if name not in router.nodes:
+            return {"cluster": op, "error": f"no node named {name!r}"}
+        if len(router.nodes) == 1:
+            return {"cluster": op, "error": "cannot remove the last node"}
+        return {"cluster": op, "node": name, "moved": router.remove_node(name)}
+    return {"cluster": op, "error": "unknown cluster operation"}
+
+
+def _next_name(router):
+    i = len(router.nodes) + 1
+    while f"n{i}" in router.nodes:
+        i += 1
+    return f"n{i}"
+
+
+def main(nodes=3, directory="sessions", vnodes=64, idle_seconds=600.0, max_resident=1000):
+    def spawn(name):
+        return spawn_node(os.path.join(directory, name), idle_seconds=idle_seconds,
+                          max_resident=max_resident)
+
+    router = Router(vnodes=vnodes)
+    try:
+        for i in range(1, max(1, nodes) + 1):
+            router.add_node(f"n{i}", spawn(f"n{i}"))
+        serve_router(router, spawn)
+    finally:
+        router.close()
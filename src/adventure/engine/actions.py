@@ -1,28 +1,25 @@
 from adventure.engine.world import short_room_text
 from adventure.engine.parser import DIR_SYNONYMS
 from adventure.engine.describe import room_text
+from adventure.engine.gen import ensure_layout
+from adventure.engine.tags import VOCAB
+from adventure.engine.progress import progress_of
+from adventure.engine.spatial import MapCoords
 import re
 
-# --- movement deltas for mapping ---
-DIR_DELTAS = {
-    "north": (0, -1, 0),
-    "south": (0,  1, 0),
-    "east":  (1,  0, 0),
-    "west":  (-1, 0, 0),
-    "up":    (0,  0, 1),
-    "down":  (0,  0,-1),
-}
-
 def do_look(gs) -> str:
     room = gs.room
-    room.seen = True
+    if not room.seen:
+        _journal(gs, "seen", room)
+        room.seen = True
     text = room_text(room, seen=True)
 
     locked = [d for d, ex in room.exits.items() if ex.locked]
     extras = []
     if locked:
         extras.append("Locked: " + ", ".join(locked) + ".")
-    if any(("note" in it.tags or "paper" in it.tags) for it in room.items):
+    note_mask = VOCAB.ns_mask("note")
+    if any(it.mask & note_mask for it in room.items):
         extras.append("There is a note here.")
     if extras:
         text += "\n" + " ".join(extras)
@@ -49,8 +46,11 @@ def do_take(gs, item_name: str) -> str:
         return "You don't see that here."
     if not item.portable:
         return "You can't take that."
+    _journal(gs, "take", gs.room, gs.room.items.index(item), item)
     gs.room.items.remove(item)
     gs.inv.append(item)
+    if getattr(gs, "progress", None) is not None:
+        gs.progress.took(gs.room.id, item)
     gs.score += 1
     return "Taken."
 
@@ -74,7 +74,7 @@ def do_use(gs, item_name: str, target: str) -> str:
         dir_target = _normalize_dir(item_name)
 
     def _artifact_count():
-        return sum(1 for it in gs.inv if any(tag.startswith("artifact:") for tag in it.tags))
+        return gs.inv.artifacts
 
     # No item: try goal gate, then auto-unlock with any carried keys
     if not item_name:
@@ -103,7 +103,7 @@ def do_use(gs, item_name: str, target: str) -> str:
         return "You don't have that."
 
     # Keys are tagged like key:*, e.g. key:rune1 / key:keycard1 / key:rusted1
-    key_tags = [t for t in item.tags if t.startswith("key:")]
+    key_tags = VOCAB.tags_of(item.mask, "key")
 
     if key_tags:
         pairs = []
@@ -161,36 +161,53 @@ def do_read(gs, item_name: str) -> str:
     item = _find_item(gs.inv, item_name) or _find_item(gs.room.items, item_name)
     if not item:
         return "You don't see that."
-    if "note" in item.tags or "paper" in item.tags or "book" in item.tags:
+    if VOCAB.has(item.mask, "note"):
         return item.description or "The writing has faded beyond use."
     return "There's nothing to read on that."
 
+MAP_RADIUS = 8  # default viewport half-width, in cells
+MAP_RADIUS_MAX = 64  # larger requests are clamped, so one `map` stays cheap
+
+def map_radius(words) -> int:
+    """Viewport radius asked for by `map` arguments, clamped to MAP_RADIUS_MAX."""
+    return min(next((int(w) for w in words if w.isascii() and w.isdigit()), MAP_RADIUS), MAP_RADIUS_MAX)
+
 def do_map(gs, scope: str = "") -> str:
     """
-    Draw an ASCII map of explored rooms with a legend:
+    Draw an ASCII map of explored rooms around you with a legend:
       [@] = you, [o] = room, [^] = room with Up, [v] = room with Down, [*] = Up+Down
       '-' / '|' = open corridor (E/W or N/S)
       '=' / '!' = locked door (E/W or N/S)
       '>' = unexplored east exit (destination not mapped yet)
       ' . ' = unexplored south exit (destination not mapped yet)
     Note: West/North exits to unmapped rooms will show as east/south stubs once you reveal the adjacent space.
-    Use `map` for current level, `map all` for all discovered Z-levels.
+    Use `map` for current level, `map all` for all discovered Z-levels, and a number
+    (`map 20`, `map all 3`) for the viewport radius around you (default 8, at most 64).
+    Only cells inside the viewport are looked up, through the chunked index in
+    `gs.map_coords`, so the cost follows the viewport, not how much is explored.
     """
-    coords = getattr(gs, "map_coords", {})
+    coords = getattr(gs, "map_coords", None)
     if not coords:
         return "No map yet."
+    if not isinstance(coords, MapCoords):
+        coords = gs.map_coords = MapCoords(coords)
 
-    # Build layers: z -> {(x,y): room_id}
-    layers = {}
-    for rid, (x, y, z) in coords.items():
-        layers.setdefault(z, {})[(x, y)] = rid
+    words = (scope or "").strip().lower().split()
+    show_all = "all" in words
+    radius = map_radius(words)
 
-    current_z = getattr(gs, "map_pos", (0, 0, 0))[2]
-    zs = sorted(layers.keys()) if (scope or "").strip().lower() == "all" else [current_z]
+    px, py, current_z = getattr(gs, "map_pos", (0, 0, 0))
+    x0, x1, y0, y1 = px - radius, px + radius, py - radius, py + radius
+    zs = sorted(coords.levels) if show_all else [current_z]
 
     out = []
+    hidden = 0
     for z in zs:
-        grid = layers[z]
+        grid = coords.window(z, x0, x1, y0, y1)
+        hidden += coords.levels.get(z, 0) - len(grid)
+        if not grid:
+            continue
+        at = lambda x, y: coords.at(x, y, z)  # neighbours may lie just outside the window
         xs = [x for (x, _) in grid.keys()]
         ys = [y for (_, y) in grid.keys()]
         minx, maxx = min(xs), max(xs)
@@ -231,7 +248,7 @@ def do_map(gs, scope: str = "") -> str:
 
                 # East connector / stub
                 if x != maxx:
-                    east_rid_mapped = grid.get((x + 1, y))
+                    east_rid_mapped = at(x + 1, y)
                     ex_e = r.exits.get("east")
                     if not ex_e:
                         room_row_parts.append(" ")
@@ -253,7 +270,7 @@ def do_map(gs, scope: str = "") -> str:
                 if rid:
                     r = gs.world.rooms[rid]
                     ex_s = r.exits.get("south")
-                    south_rid = grid.get((x, y + 1))
+                    south_rid = at(x, y + 1)
                     if ex_s and south_rid and ex_s.to == south_rid:
                         conn_row_parts.append(" ! " if ex_s.locked else " | ")
                         any_conn_row = True
@@ -282,6 +299,9 @@ def do_map(gs, scope: str = "") -> str:
                 out.append("Current room has vertical exits: " + " and ".join(ud))
         out.append("")
 
+    if hidden:
+        out.append(f"({hidden} mapped room{'s' if hidden != 1 else ''} outside this view; try `map {radius * 2}`.)")
+
     # Add a compact legend
     out.append("Legend:")
     out.append("  [@]=you  [o]=room  [^]=up  [v]=down  [*]=up+down")
@@ -293,6 +313,37 @@ def do_map(gs, scope: str = "") -> str:
 
                 
 
+def do_hint(gs) -> str:
+    """Nudge toward the next step, from the incrementally kept reachability."""
+    p = progress_of(gs)
+    rooms = gs.world.rooms
+    reach = len(p.reachable_rooms(gs.room.id))
+    lines = [f"You can reach {reach} of {len(rooms)} rooms."]
+    if p.gate_open():
+        lines.append("The vault already stands open.")
+    elif (opens := p.openable(gs)):
+        rid, d = opens[0]
+        where = "here" if rid == gs.room.id else f"in the {rooms[rid].name}"
+        lines.append(f"You carry what opens the way {d} {where}.")
+    elif (loot := p.loot_rooms(gs)):
+        rid = gs.room.id if gs.room.id in loot else loot[0]
+        where = "Something here" if rid == gs.room.id else f"Something in the {rooms[rid].name}"
+        lines.append(f"{where} is worth taking.")
+    elif not p.can_finish(gs):
+        lines.append("Nothing left within reach will open the vault.")
+    else:
+        lines.append("Look for a way onward.")
+    return "\n".join(lines)
+
+def do_undo(gs, rest: str = "") -> str:
+    rest = (rest or "").strip()
+    if rest and not (rest.isascii() and rest.isdigit()):
+        return "Undo how many turns?"
+    n = gs.undo(int(rest or 1))
+    if not n:
+        return "Nothing to undo."
+    return f"Undone {n} turn{'s' if n != 1 else ''}.\n" + room_text(gs.room, seen=True)
+
 def do_debug(gs) -> str:
     room = gs.room
     lines = [f"Room {room.id} ({room.name})"]
@@ -354,16 +405,8 @@ def _find_item(items, query):
             return it
     return None
 
-def _inventory_key_tags(gs):
-    tags = []
-    for it in gs.inv:
-        for t in it.tags:
-            if t.startswith("key:"):
-                tags.append(t)
-    return set(tags)
-
 def _auto_unlock_with_inventory(gs, dir_target: str | None):
-    keys = _inventory_key_tags(gs)
+    keys = gs.inv.key_tags  # kept up to date by Inventory
     if not keys:
         return []
     exits = gs.room.exits
@@ -387,25 +430,67 @@ def _unlocked_msg(unlocked_dirs):
            else "You unlock the ways " + ", ".join(unlocked_dirs) + "."
 
 def _unlock_reverse(gs, ex):
+    _journal(gs, "lock", ex)
     to_room = gs.world.rooms[ex.to]
     for d2, ex2 in to_room.exits.items():
         if ex2.to == gs.room.id:
+            if ex2.locked:
+                _journal(gs, "lock", ex2)
             ex2.locked = False
-            return
+            break
+    if getattr(gs, "progress", None) is not None:
+        gs.progress.unlocked(gs.room.id, ex.to)
+    if getattr(gs, "ticks", None) is not None:
+        gs.ticks.unlocked(gs.room.id, ex, gs.turns)
 
 def _record_mapping(gs, direction: str, to_rid: str):
-    """Assign coordinates to rooms as you move."""
-    if not hasattr(gs, "map_coords") or gs.map_coords is None:
-        gs.map_coords = {}
-    if not hasattr(gs, "map_pos") or gs.map_pos is None:
-        gs.map_pos = (0, 0, 0)
-    # ensure current room has coords
-    gs.map_coords.setdefault(gs.room.id, gs.map_pos)
-    dx, dy, dz = DIR_DELTAS.get(direction, (0, 0, 0))
-    x, y, z = gs.map_pos
-    nx, ny, nz = x + dx, y + dy, z + dz
-    # assign new room if unknown
-    gs.map_coords.setdefault(to_rid, (nx, ny, nz))
+    """Reveal the precomputed layout positions of the rooms you move between."""
+    if not isinstance(getattr(gs, "map_coords", None), MapCoords):
+        gs.map_coords = MapCoords(getattr(gs, "map_coords", None) or {})
+    layout = ensure_layout(gs.world)
+    # ensure current room is revealed
+    for rid in (gs.room.id, to_rid):
+        if rid not in gs.map_coords:
+            _journal(gs, "map", rid)
+            gs.map_coords[rid] = layout[rid]
+    pos = layout[to_rid]
     # move player position
-    gs.map_pos = (nx, ny, nz)
-
+    gs.map_pos = pos
+
+
+# ---------- undo journal ----------
+# Each turn, GameState.changes collects the inverse of every world change
+# made in it: ("seen", room), ("take", room, index, item), ("lock", exit),
+# ("map", rid), and from timed events ("unlock", exit) and
+# ("moved", src, index, dst, item). Scalars (room, score, map_pos, ...) are
+# saved per turn by GameState itself.
+
+def _journal(gs, *op):
+    changes = getattr(gs, "changes", None)
+    if changes is not None:
+        changes.append(op)
+
+def _revert(gs, op):
+    kind = op[0]
+    if kind == "seen":
+        op[1].seen = False
+    elif kind == "take":
+        _, room, index, item = op
+        for i in range(len(gs.inv) - 1, -1, -1):
+            if gs.inv[i] is item:
+                del gs.inv[i]
+                break
+        room.items.insert(index, item)
+    elif kind == "lock":
+        op[1].locked = True
+    elif kind == "map":
+        gs.map_coords.pop(op[1], None)
+    elif kind == "unlock":
+        op[1].locked = False
+    elif kind == "moved":
+        _, src, index, dst, item = op
+        for i in range(len(dst.items) - 1, -1, -1):
+            if dst.items[i] is item:
+                del dst.items[i]
+                break
+        src.items.insert(index, item)
@@ -0,0 +1,103 @@
+"""
+Background autosave.
+
+`request` takes a plain-data snapshot of the game (`save._state_dict`) on
+the caller's thread and hands it to one writer thread, which serializes it
+and writes it atomically. Only the newest pending snapshot per key is kept,
+so a slow disk drops intermediate autosaves instead of queueing them, and
+turn latency never waits on a write.
+
+    saver = Autosaver()
+    saver.request("p1", gs, "autosave.json")   # every turn, cheap
+    ...
+    saver.close()                              # on quit / shutdown: writes what is pending
+
+A failed write is kept in `errors`; `new_errors` hands each failing path to
+the caller once, so a bad `--autosave` path is reported instead of failing
+silently on every turn.
+"""
+import json
+import threading
+import time
+
+from adventure.engine import metrics
+from adventure.engine.save import _state_dict, _write_atomic
+
+AUTOSAVES = metrics.REGISTRY.counter("infoprox_autosaves_total", "Autosaves written by the background writer.")
+COALESCED = metrics.REGISTRY.counter("infoprox_autosaves_coalesced_total",
+                                     "Autosave requests replaced by a newer one before being written.")
+
+
+class Autosaver:
+    def __init__(self):
+        self.pending = {}  # key -> (path, state dict), newest only
+        self.busy = False  # writer is between taking a batch and finishing it
+        self.closed = False
+        self.errors = []   # (path, exception) from failed writes, oldest first
+        self._reported = set()  # paths already returned by new_errors
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def request(self, key, gs, path):
+        """Queue an autosave of `gs` to `path`, replacing any pending one for `key`."""
+        state = _state_dict(gs)
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("autosaver is closed")
+            if key in self.pending:
+                COALESCED.inc()
+            self.pending[key] = (path, state)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until everything requested so far is on disk; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+    def new_errors(self):
+        """Messages for paths whose writes failed and were not reported before."""
+        with self._cond:
+            out = []
+            for path, e in self.errors:
+                if path not in self._reported:
+                    self._reported.add(path)
+                    out.append(f"Autosave to {path} failed: {e}")
+            return out
+
+    def close(self, timeout=None):
+        """Write what is pending, then stop the writer thread."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.pending or self.closed)
+                if not self.pending:
+                    self._cond.notify_all()
+                    return
+                batch, self.pending = self.pending, {}
+                self.busy = True
+            try:
+                for path, state in batch.values():
+                    self._write(path, state)
+            finally:
+                with self._cond:
+                    self.busy = False
+                    self._cond.notify_all()
+
+    def _write(self, path, state):
+        t0 = time.perf_counter()
+        try:
+            text = json.dumps(state, indent=2)
+            _write_atomic(path, text)
+        except Exception as e:  # the writer must outlive any one bad save
+            with self._cond:
+                self.errors.append((path, e))
+            return
+        metrics.SAVE_SECONDS.observe(time.perf_counter() - t0)
+        metrics.SAVE_BYTES.inc(len(text))
+        AUTOSAVES.inc()
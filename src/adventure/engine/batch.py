@@ -0,0 +1,371 @@
+"""
+Vectorized world skeletons: the structure of many worlds at once, no prose.
+
+`make_skeletons` follows the same rules as `make_world` (archetype per room,
+a shuffled spine, `n_rooms // 6 - 1` extra horizontal links, 0-2 vertical
+links, a vault that is not a cut vertex behind the goal gate, key locks on
+bridges with each key on the near side of the previous lock, three artifacts
+outside the vault), but runs every phase as NumPy array operations across
+the whole batch.
+
+Each world draws from its own counter-based stream keyed on its seed, so a
+seed yields the same skeleton whatever else is in the batch. The streams are
+not Python's `random`, so skeleton `i` is its own world, not a copy of
+`make_world(seed=seeds[i])`; `expand` turns it into a full `World` on demand.
+
+Requires numpy (`pip install infoprox[batch]`).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from adventure.engine.gen import THEMES, _layout
+from adventure.engine.tags import VOCAB
+from adventure.engine.world import World, Room, Item, Exit, DIRECTIONS
+
+N_KEYS = 2
+N_ARTIFACTS = 3
+GOAL = -1  # lock code for the vault gate; 1..N_KEYS are key numbers, 0 is open
+
+_UP, _DOWN = DIRECTIONS.index("up"), DIRECTIONS.index("down")
+_OPP = np.array([1, 0, 3, 2, 5, 4], dtype=np.int8)  # DIRECTIONS index -> opposite
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+@dataclass
+class Skeletons:
+    """Structure of B worlds with N rooms and M links each (room i is "r{i}")."""
+    seeds: np.ndarray          # (B,) uint64
+    theme: str
+    n_rooms: int
+    order: np.ndarray          # (B, N) room index at each spine position; order[:, 0] is start
+    arch: np.ndarray           # (B, N) index into THEMES[theme]["archetypes"]
+    adj: np.ndarray            # (B, N) index into the archetype's adjectives
+    edge_a: np.ndarray         # (B, M) room index
+    edge_b: np.ndarray         # (B, M) room index
+    edge_da: np.ndarray        # (B, M) DIRECTIONS index of a -> b, -1 if the link was dropped
+    edge_db: np.ndarray        # (B, M) DIRECTIONS index of b -> a
+    lock: np.ndarray           # (B, M) 0 open, k = key k, GOAL = vault gate
+    vault: np.ndarray          # (B,) room index
+    key_room: np.ndarray       # (B, K) room index of key 1..K, -1 where there was no bridge to lock
+    artifact_room: np.ndarray  # (B, N_ARTIFACTS) room index per artifact name
+
+    def __len__(self):
+        return len(self.seeds)
+
+
+class _Streams:
+    """One splitmix64 counter stream per world, drawn in lockstep."""
+
+    def __init__(self, seeds, phase):
+        self.base = _mix(seeds ^ np.uint64(phase))
+        self.ctr = np.uint64(0)
+
+    def bits(self, k):
+        ctr = self.ctr + np.arange(1, k + 1, dtype=np.uint64)
+        self.ctr += np.uint64(k)
+        return _mix(self.base[:, None] + ctr[None, :] * _GOLDEN)
+
+    def uniform(self, k):
+        return (self.bits(k) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def integers(self, n, k):
+        """Ints in [0, n) with shape (B, k); `n` may be a scalar or a (B, 1) array."""
+        return (self.uniform(k) * n).astype(np.int64)
+
+
+def _mix(x):
+    z = x + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _M1
+    z = (z ^ (z >> np.uint64(27))) * _M2
+    return z ^ (z >> np.uint64(31))
+
+
+def make_skeletons(seeds, n_rooms=12, theme="fantasy", n_keys=N_KEYS) -> Skeletons:
+    theme = (theme or "fantasy").lower()
+    if theme not in THEMES:
+        theme = "fantasy"
+    n = max(8, min(15, int(n_rooms or 12)))
+    seeds = np.asarray(seeds).astype(np.uint64).reshape(-1)
+    B = len(seeds)
+    rows = np.arange(B)[:, None]
+    T = THEMES[theme]
+    archs = T["archetypes"]
+
+    # --- rooms ---
+    rs = _Streams(seeds, 1)
+    order = np.argsort(rs.uniform(n), axis=1, kind="stable")
+    pos = np.argsort(order, axis=1, kind="stable")  # room index -> spine position
+    arch = rs.integers(len(archs), n)
+    adj = rs.integers(2, n)
+
+    # --- links: spine, extras, verticals ---
+    ls = _Streams(seeds, 2)
+    extra = max(0, n // 6 - 1)
+    v_links = 2 if n >= 14 else 1 if n >= 10 else 0
+    m = (n - 1) + extra + v_links
+    edge_a = np.zeros((B, m), dtype=np.int64)
+    edge_b = np.zeros((B, m), dtype=np.int64)
+    edge_da = np.full((B, m), -1, dtype=np.int64)
+    edge_db = np.full((B, m), -1, dtype=np.int64)
+    occ = np.zeros((B, n, len(DIRECTIONS)), dtype=bool)
+    nbr = np.zeros((B, n), dtype=np.int64)  # room -> bitmask of rooms it already links to
+    h = np.arange(4)
+
+    pairs = [(order[:, k], order[:, k + 1]) for k in range(n - 1)]
+    for _ in range(extra):
+        a = ls.integers(n, 1)[:, 0]
+        b = (a + 1 + ls.integers(n - 1, 1)[:, 0]) % n
+        pairs.append((a, b))
+    for e, (a, b) in enumerate(pairs):
+        # `_connect`: a random direction free on a whose opposite is free on b, else any
+        # free direction on each side; never a second link between the same two rooms
+        free_a, free_b = ~occ[rows, a[:, None], h], ~occ[rows, b[:, None], h]
+        free = free_a & free_b[:, _OPP[:4]]
+        da = np.where(free, ls.uniform(4), -1.0).argmax(axis=1)
+        bend_a = np.where(free_a, ls.uniform(4), -1.0).argmax(axis=1)
+        bend_b = np.where(free_b, ls.uniform(4), -1.0).argmax(axis=1)
+        opposite = free.any(axis=1)
+        ok = (opposite | (free_a.any(axis=1) & free_b.any(axis=1))) & ~_linked(nbr, a, b)
+        _add_edge(occ, nbr, edge_a, edge_b, edge_da, edge_db, e, a, b,
+                  np.where(opposite, da, bend_a), np.where(opposite, _OPP[da], bend_b), ok)
+
+    tries = 32
+    for v in range(v_links):
+        e = len(pairs) + v
+        a = ls.integers(n, tries)
+        b = (a + 1 + ls.integers(n - 1, tries)) % n
+        free = ~occ[rows, a, _UP] & ~occ[rows, b, _DOWN] & ~_linked(nbr, a, b)
+        first = free.argmax(axis=1)
+        ok = free[np.arange(B), first]
+        _add_edge(occ, nbr, edge_a, edge_b, edge_da, edge_db, e,
+                  a[np.arange(B), first], b[np.arange(B), first], _UP, _DOWN, ok)
+
+    valid = edge_da >= 0
+    pa = np.take_along_axis(pos, edge_a, 1)
+    pb = np.take_along_axis(pos, edge_b, 1)
+    lo, hi = np.minimum(pa, pb), np.maximum(pa, pb)
+    chord = valid & (np.arange(m)[None, :] >= n - 1)  # every link that isn't on the spine
+
+    # --- vault: first room in spine order with the vault archetype that is neither the
+    #     start nor a cut vertex, else the last spine room (a path end is never a cut) ---
+    # spine position p is a cut vertex unless some chord not touching p spans it
+    p_idx = np.arange(n)
+    spanned = (chord[:, :, None] & (lo[:, :, None] < p_idx) & (hi[:, :, None] > p_idx)).any(axis=1)
+    cut = ~spanned
+    cut[:, 0] = cut[:, -1] = False
+    vault_arch = next((i for i, a in enumerate(archs) if a[0] == T["vault_arch"]), -1)
+    ok_pos = (np.take_along_axis(arch, order, axis=1) == vault_arch) & ~cut
+    ok_pos[:, 0] = False
+    vault_pos = np.where(ok_pos.any(axis=1), ok_pos.argmax(axis=1), n - 1)
+    vault = order[np.arange(B), vault_pos]
+
+    # --- locks: the goal gate on every vault exit, key locks on bridges of the rest ---
+    lock = np.zeros((B, m), dtype=np.int64)
+    vp = vault_pos[:, None]
+    touches_vault = valid & ((pa == vp) | (pb == vp))
+    lock[touches_vault] = GOAL
+    usable = valid & ~touches_vault
+    bridge, parent_pos, child_pos = _bridges(lo, hi, usable, chord, vault_pos, n)
+
+    start = order[:, 0]
+    parent = np.take_along_axis(order, parent_pos, 1)
+    child = np.take_along_axis(order, child_pos, 1)
+    start_deg = (usable & ((edge_a == start[:, None]) | (edge_b == start[:, None]))).sum(axis=1)
+    # a lock right at a dead-end start would just put its key at your feet: last resort only
+    dead_end = (parent == start[:, None]) & (start_deg[:, None] == 1)
+    lks = _Streams(seeds, 4)
+    score = np.where(bridge, lks.uniform(m) + dead_end, np.inf)
+    picked = np.argsort(score, axis=1, kind="stable")[:, :n_keys]
+    picked_ok = np.isfinite(np.take_along_axis(score, picked, 1))
+    # nearest-first, so each lock's parent side is open before its key is needed
+    depth = _depths(start, edge_a, edge_b, usable, n)
+    d = np.where(picked_ok, np.take_along_axis(depth, np.take_along_axis(child, picked, 1), 1), n + 1)
+    picked = np.take_along_axis(picked, np.argsort(d, axis=1, kind="stable"), 1)
+    picked_ok = np.take_along_axis(picked_ok, np.argsort(d, axis=1, kind="stable"), 1)
+    for k in range(n_keys):
+        hit = np.arange(B)[picked_ok[:, k]]
+        lock[hit, picked[hit, k]] = k + 1
+
+    # --- items: key k in the region opened by lock k-1 (key 1 anywhere reachable) ---
+    its = _Streams(seeds, 3)
+    key_room = np.full((B, n_keys), -1, dtype=np.int64)
+    open_ = usable & (lock == 0)
+    before = np.zeros((B, n), dtype=bool)
+    for k in range(n_keys):
+        region = _reachable(start, edge_a, edge_b, open_, n)
+        fresh = region & ~before
+        key_room[:, k] = np.where(picked_ok[:, k], np.where(fresh, its.uniform(n), 2.0).argmin(axis=1), -1)
+        open_ |= usable & (lock == k + 1)
+        before = region
+    art_keys = its.uniform(n)
+    art_keys[np.arange(B), vault] = 2.0
+    artifact_room = np.argsort(art_keys, axis=1, kind="stable")[:, :N_ARTIFACTS]
+
+    return Skeletons(
+        seeds=seeds, theme=theme, n_rooms=n, order=order, arch=arch, adj=adj,
+        edge_a=edge_a, edge_b=edge_b, edge_da=edge_da, edge_db=edge_db, lock=lock,
+        vault=vault, key_room=key_room, artifact_room=artifact_room,
+    )
+
+
+def _linked(nbr, a, b):
+    """Whether rooms a and b (same shape, (B,) or (B, k)) already share a link."""
+    rows = np.arange(len(a)).reshape((-1,) + (1,) * (a.ndim - 1))
+    return ((nbr[rows, a] >> b) & 1).astype(bool)
+
+
+def _add_edge(occ, nbr, edge_a, edge_b, edge_da, edge_db, e, a, b, da, db, ok):
+    B = len(a)
+    da = np.broadcast_to(da, (B,))
+    db = np.broadcast_to(db, (B,))
+    edge_a[:, e], edge_b[:, e] = a, b
+    edge_da[:, e] = np.where(ok, da, -1)
+    edge_db[:, e] = np.where(ok, db, -1)
+    idx = np.arange(B)[ok]
+    occ[idx, a[ok], da[ok]] = True
+    occ[idx, b[ok], db[ok]] = True
+    nbr[idx, a[ok]] |= np.int64(1) << b[ok]
+    nbr[idx, b[ok]] |= np.int64(1) << a[ok]
+
+
+def _bridges(lo, hi, usable, chord, vault_pos, n):
+    """
+    Bridges of the graph minus the vault, from the spine structure instead of a DFS.
+    With the vault removed the spine is cut at the vault position and at the spine
+    link under test, leaving at most three intervals that only chords can rejoin.
+    Returns (bridge mask, parent position, child position), the parent being on
+    the start's side.
+    """
+    B, m = lo.shape
+    v = vault_pos[:, None]
+    chord = chord & usable
+    bridge = np.zeros((B, m), dtype=bool)
+    parent = np.zeros((B, m), dtype=np.int64)
+    child = np.zeros((B, m), dtype=np.int64)
+    rows = np.arange(B)
+    pair = np.arange(9)
+    for k in range(n - 1):
+        # piece of a spine position: 0 before both cuts, 1 between, 2 after both
+        ca = (lo > k).astype(np.int64) + (lo > v)
+        cb = (hi > k).astype(np.int64) + (hi > v)
+        # which piece pairs some chord joins, as a 9-bit mask (ca <= cb since lo <= hi)
+        bits = np.bitwise_or.reduce(np.where(chord, 1 << (ca * 3 + cb), 0), axis=1)
+        link = ((bits[:, None] >> pair) & 1).astype(bool).reshape(B, 3, 3)
+        link |= link.transpose(0, 2, 1)
+        conn = link | (link[:, :, :, None] & link[:, None, :, :]).any(axis=2)  # via the third piece
+        x = (k > vault_pos).astype(np.int64)  # piece of position k
+        y = x + 1                              # piece of position k + 1
+        joined = conn[rows, x, y]
+        bridge[:, k] = usable[:, k] & ~joined
+        # k's side holds the start unless both sides are past the vault and only k+1 reaches piece 0
+        near = (x == 0) | conn[rows, x, 0]
+        parent[:, k] = np.where(near, k, k + 1)
+        child[:, k] = np.where(near, k + 1, k)
+    # a chord is a bridge only when it is the sole link across the removed vault
+    across = chord & (lo < v) & (hi > v)
+    bridge |= across & (across.sum(axis=1, keepdims=True) == 1)
+    parent = np.where(across, lo, parent)
+    child = np.where(across, hi, child)
+    return bridge, parent, child
+
+
+def _reachable(start, edge_a, edge_b, open_, n):
+    """(B, N) rooms reachable from start over open links, as room bitmasks."""
+    B = len(start)
+    one = np.int64(1)
+    nbr = np.zeros((B, n), dtype=np.int64)  # room -> bitmask of open neighbours
+    rows = np.broadcast_to(np.arange(B)[:, None], edge_a.shape)
+    np.bitwise_or.at(nbr, (rows[open_], edge_a[open_]), one << edge_b[open_])
+    np.bitwise_or.at(nbr, (rows[open_], edge_b[open_]), one << edge_a[open_])
+    bit = one << np.arange(n)
+    reach = one << start
+    for _ in range(n - 1):
+        inside = (reach[:, None] & bit) != 0
+        grown = reach | np.bitwise_or.reduce(np.where(inside, nbr, 0), axis=1)
+        if (grown == reach).all():
+            break
+        reach = grown
+    return (reach[:, None] & bit) != 0
+
+
+def _depths(start, edge_a, edge_b, open_, n):
+    """(B, N) BFS depth from start over open links (n + 1 where unreachable)."""
+    B = len(start)
+    one = np.int64(1)
+    nbr = np.zeros((B, n), dtype=np.int64)
+    rows = np.broadcast_to(np.arange(B)[:, None], edge_a.shape)
+    np.bitwise_or.at(nbr, (rows[open_], edge_a[open_]), one << edge_b[open_])
+    np.bitwise_or.at(nbr, (rows[open_], edge_b[open_]), one << edge_a[open_])
+    bit = one << np.arange(n)
+    depth = np.full((B, n), n + 1, dtype=np.int64)
+    depth[np.arange(B), start] = 0
+    reach = frontier = one << start
+    for dist in range(1, n):
+        inside = (frontier[:, None] & bit) != 0
+        frontier = np.bitwise_or.reduce(np.where(inside, nbr, 0), axis=1) & ~reach
+        if not frontier.any():
+            break
+        reach |= frontier
+        depth[(frontier[:, None] & bit) != 0] = dist
+    return depth
+
+
+def expand(sk: Skeletons, i: int) -> World:
+    """Build the full `World` for skeleton `i`."""
+    T = THEMES[sk.theme]
+    archs = T["archetypes"]
+    rooms = {}
+    for r in sk.order[i]:
+        arch_id, display, adjs = archs[sk.arch[i, r]]
+        adj = adjs[sk.adj[i, r]]
+        rid = f"r{r}"
+        rooms[rid] = Room(
+            id=rid,
+            name=display,
+            tags=[f"arch:{arch_id}", f"theme:{sk.theme}", adj],
+            base_desc=f"A {adj} {display.lower()}.",
+        )
+
+    for a, b, da, db, lk in zip(sk.edge_a[i], sk.edge_b[i], sk.edge_da[i], sk.edge_db[i], sk.lock[i]):
+        if da < 0:
+            continue
+        tag = "goal:artifacts3" if lk == GOAL else f"{T['key_prefix']}{lk}" if lk > 0 else None
+        rooms[f"r{a}"].exits[DIRECTIONS[da]] = Exit(to=f"r{b}", locked=bool(lk), key_tag=tag)
+        rooms[f"r{b}"].exits[DIRECTIONS[db]] = Exit(to=f"r{a}", locked=bool(lk), key_tag=tag)
+
+    vault = rooms[f"r{sk.vault[i]}"]
+    if f"arch:{T['vault_arch']}" not in vault.tags:
+        vault.name = "Vault"
+        vault.add_tag(f"arch:{T['vault_arch']}")
+        vault.base_desc = "A sealed vault."
+    vault.items.append(T["vault_fixture"])
+
+    for number, r in enumerate(sk.key_room[i], start=1):
+        if r < 0:
+            continue
+        rooms[f"r{r}"].items.append(Item(
+            name=T["key_display"](number),
+            tags=[f"{T['key_prefix']}{number}", "key"],
+            description="It fits something around here.",
+        ))
+    for room in rooms.values():
+        if any(VOCAB.has(it.mask, "key") for it in room.items):
+            hint_dir = next((d for d, ex in room.exits.items() if ex.locked), None)
+            room.items.append(Item(
+                name=T["note_name"],
+                tags=["note", "paper"],
+                description=T["note_line"](hint_dir),
+            ))
+    for name, r in zip(T["artifact_names"], sk.artifact_room[i]):
+        rooms[f"r{r}"].items.append(Item(
+            name=name,
+            tags=[f"artifact:{name.split()[0]}"],
+            description=f"A curious {name}. It feels significant.",
+        ))
+
+    world = World(rooms=rooms, start=f"r{sk.order[i, 0]}", seed=int(sk.seeds[i]), theme=sk.theme)
+    world.layout = _layout(world)
+    return world
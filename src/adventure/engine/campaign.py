@@ -0,0 +1,161 @@
+"""
+Campaign mode: worlds chained one after another.
+
+When the vault gate of the current world opens, play moves straight on to
+the next world, carrying score and turn count over. Each later level's seed
+(and theme, unless one is fixed) is derived from the campaign seed, so a
+campaign replays the same way.
+
+Upcoming worlds are generated and checked for solvability on a background
+thread while the current one is played, `prefetch` levels ahead, so the
+transition does not stall on `make_world`. Prefetching uses a thread, not
+a process, because tag masks are only valid inside the process that
+interned them. `set_prefetch` changes the depth (cancelling surplus work)
+and `close` cancels everything pending.
+
+    camp = Campaign(seed=7, prefetch=2)
+    camp.apply("look")      # like GameState.apply, plus level transitions
+    camp.close()
+"""
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from adventure.engine import metrics
+from adventure.engine.actions import do_look
+from adventure.engine.autosave import Autosaver
+from adventure.engine.gen import THEMES, make_world
+from adventure.engine.inventory import Inventory
+from adventure.engine.loop import banner, enter_world, report_autosave, step
+from adventure.engine.progress import Progress, progress_of
+
+TRANSITION_SECONDS = metrics.REGISTRY.summary(
+    "infoprox_campaign_transition_seconds", "Time the player waited for the next campaign world.")
+PREFETCHED = metrics.REGISTRY.counter(
+    "infoprox_campaign_prefetched_total", "Campaign worlds generated ahead of time.")
+
+
+class Campaign:
+    def __init__(self, seed=None, theme=None, rooms=15, prefetch=1, ticks=False):
+        self.seed = seed if seed is not None else random.randrange(1_000_000)
+        self.theme = theme
+        self.rooms = rooms
+        self.ticks = ticks
+        self.prefetch = max(0, int(prefetch))
+        self.level = 1
+        self._pool = None
+        self._ahead = deque()  # futures for levels level+1, level+2, ...
+        self.gs = enter_world(self.build(1), ticks=ticks)
+        self._fill()
+
+    # ---------- levels ----------
+
+    def level_params(self, level):
+        """(seed, theme) of `level`; level 1 uses the campaign seed itself."""
+        rng = random.Random(f"{self.seed}:campaign:{level}")
+        seed = self.seed if level == 1 else rng.randrange(1_000_000_000)
+        theme = self.theme or rng.choice(sorted(THEMES))
+        return seed, theme
+
+    def build(self, level):
+        """Generate `level`'s world and make sure it can be finished."""
+        seed, theme = self.level_params(level)
+        world = make_world(seed=seed, n_rooms=self.rooms, theme=theme)
+        if not check_world(world):
+            raise RuntimeError(f"campaign level {level} (seed {seed}) cannot be finished")
+        return world
+
+    def cleared(self) -> bool:
+        """Whether the current world's vault gate is open."""
+        return progress_of(self.gs).gate_open()
+
+    def advance(self) -> str:
+        """Move to the next level; returns the text to show for the transition."""
+        t0 = time.perf_counter()
+        nxt = self.level + 1
+        world = self._ahead.popleft().result() if self._ahead else self.build(nxt)
+        TRANSITION_SECONDS.observe(time.perf_counter() - t0)
+        old = self.gs
+        self.level = nxt
+        self.gs = enter_world(world, score=old.score, turns=old.turns, ticks=self.ticks)
+        self._fill()
+        return (
+            f"Beyond the vault a passage leads on. Level {self.level}: "
+            f"{world.theme}, seed {world.seed}. Score so far: {old.score}.\n"
+            + do_look(self.gs)
+        )
+
+    def apply(self, commands, join=False):
+        """Run commands like `GameState.apply`, moving on to the next world when one is cleared."""
+        if isinstance(commands, str):
+            commands = [commands]
+        out = []
+        for cmd in commands:
+            if self.gs.over:
+                break
+            out.append(step(self.gs, cmd)[1])
+            if not self.gs.over and self.cleared():
+                out.append(self.advance())
+        return "\n".join(out) if join else out
+
+    # ---------- prefetch ----------
+
+    def set_prefetch(self, depth):
+        """Keep `depth` levels generated ahead; surplus pending work is cancelled."""
+        self.prefetch = max(0, int(depth))
+        while len(self._ahead) > self.prefetch:
+            self._ahead.pop().cancel()
+        self._fill()
+
+    def cancel(self):
+        """Drop every prefetched or pending world (they are rebuilt on demand)."""
+        while self._ahead:
+            self._ahead.pop().cancel()
+
+    def close(self):
+        self.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _fill(self):
+        if not self.prefetch:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="campaign-prefetch")
+        while len(self._ahead) < self.prefetch:
+            level = self.level + len(self._ahead) + 1
+            self._ahead.append(self._pool.submit(self._prefetch, level))
+
+    def _prefetch(self, level):
+        world = self.build(level)
+        PREFETCHED.inc()
+        return world
+
+
+def check_world(world) -> bool:
+    """Whether a fresh player at `world`'s start could open the vault."""
+    probe = SimpleNamespace(room=world.rooms[world.start], inv=Inventory())
+    return Progress(world).can_finish(probe)
+
+
+def start_campaign(seed=None, theme=None, rooms=15, prefetch=1, autosave=None, ticks=False):
+    """Interactive campaign (`infoprox play --campaign`)."""
+    camp = Campaign(seed=seed, theme=theme, rooms=rooms, prefetch=prefetch, ticks=ticks)
+    saver = Autosaver() if autosave else None
+    print(banner(camp.gs.world.seed, theme=camp.gs.world.theme))
+    print(f"Campaign {camp.seed}: each opened vault leads to the next world.")
+    print(do_look(camp.gs))
+    try:
+        while not camp.gs.over:
+            print(camp.apply(input("\n> ").strip(), join=True))
+            if saver:
+                saver.request("campaign", camp.gs, autosave)
+                report_autosave(saver)
+    finally:
+        camp.close()
+        if saver:
+            saver.close()
+            report_autosave(saver)
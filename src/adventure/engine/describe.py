@@ -1,5 +1,7 @@
 import random
 
+from adventure.engine.tags import VOCAB
+
 THEME_FLAVOR = {
     "fantasy": {
         "great_hall": ["Banners stir in a draft.", "Footsteps echo off stone."],
@@ -46,17 +48,14 @@ def _and_join(words):
     if len(words) == 1: return words[0]
     return ", ".join(words[:-1]) + " and " + words[-1]
 
+# a room can carry two arch tags (one promoted to vault keeps its own), so
+# resolve in tag-list order: mask ids depend on this process's interning order
+
 def _get_theme(room):
-    for t in room.tags:
-        if t.startswith("theme:"):
-            return t.split(":", 1)[1]
-    return "fantasy"
+    return VOCAB.value(room.mask, "theme", room.tags) or "fantasy"
 
 def _get_arch(room):
-    for t in room.tags:
-        if t.startswith("arch:"):
-            return t.split(":", 1)[1]
-    return None
+    return VOCAB.value(room.mask, "arch", room.tags)
 
 def room_text(room, seen=False):
     rng = random.Random(room.id)
@@ -1,5 +1,8 @@
-from adventure.engine.world import World, Room, Item, Exit, DIRECTIONS
+from adventure.engine.world import World, Room, Item, Exit, DIRECTIONS, DIR_DELTAS
+from adventure.engine.tags import VOCAB
+from adventure.engine import metrics
 import random
+import time
 from collections import deque
 
 # We’ll keep most links horizontal (N/S/E/W) and add at most a couple vertical links.
@@ -87,16 +90,29 @@ THEMES = {
     },
 }
 
-def make_world(seed=None, n_rooms=12, theme="fantasy") -> World:
+def make_world(seed=None, n_rooms=12, theme="fantasy", store=None, n_keys=2) -> World:
+    """
+    Generate a world. With `store` (an empty `store.SQLiteRooms`), the rooms are
+    written to it in batches and `World.rooms`/`World.layout` read through it.
+    Up to `n_keys` key locks are planned (fewer if the map has fewer bridges).
+    """
+    t0 = time.perf_counter()
     theme = (theme or "fantasy").lower()
     if theme not in THEMES:
         theme = "fantasy"
     # Hard cap: keep things focused
     n_rooms = max(8, min(15, int(n_rooms or 12)))
+    if seed is None:
+        seed = random.randrange(1_000_000)
+
+    # One independent stream per phase, so changing one phase never reshuffles the others
+    rng_rooms = _phase_rng(seed, "rooms")
+    rng_links = _phase_rng(seed, "links")
+    rng_locks = _phase_rng(seed, "locks")
+    rng_items = _phase_rng(seed, "items")
 
-    rng = random.Random(seed)
     ids = [f"r{i}" for i in range(n_rooms)]
-    rng.shuffle(ids)
+    rng_rooms.shuffle(ids)
 
     T = THEMES[theme]
     archs = T["archetypes"]
@@ -104,8 +120,8 @@ def make_world(seed=None, n_rooms=12, theme="fantasy") -> World:
     # Rooms with theme + archetype tags
     rooms = {}
     for rid in ids:
-        arch_id, display, adjs = rng.choice(archs)
-        adj = rng.choice(adjs)
+        arch_id, display, adjs = rng_rooms.choice(archs)
+        adj = rng_rooms.choice(adjs)
         base_desc = f"A {adj} {display.lower()}."
         rooms[rid] = Room(
             id=rid,
@@ -117,12 +133,12 @@ def make_world(seed=None, n_rooms=12, theme="fantasy") -> World:
     # --- Graph: a simple chain (spine) + a few extra horizontal links for mild branching ---
     # (horizontal only for clarity; we'll add <=2 vertical links later)
     for a, b in zip(ids, ids[1:]):
-        _connect(rooms[a], rooms[b], rng, allowed_dirs=H_DIRS)
+        _connect(rooms[a], rooms[b], rng_links, allowed_dirs=H_DIRS)
 
     extra_links = max(0, n_rooms // 6 - 1)  # softer branching than before
     for _ in range(extra_links):
-        a, b = rng.sample(ids, 2)
-        _connect(rooms[a], rooms[b], rng, allowed_dirs=H_DIRS)
+        a, b = rng_links.sample(ids, 2)
+        _connect(rooms[a], rooms[b], rng_links, allowed_dirs=H_DIRS)
 
     # Add at most 0–2 vertical links to keep levels sane
     v_links = 0
@@ -130,69 +146,48 @@ def make_world(seed=None, n_rooms=12, theme="fantasy") -> World:
         v_links = 1
     if n_rooms >= 14:
         v_links = 2
-    _add_vertical_links(rooms, rng, v_links=v_links)
+    _add_vertical_links(rooms, rng_links, v_links=v_links)
 
     start = ids[0]
+    adj = _adjacency(rooms)
 
-    # Choose a Vault room (by arch tag); ensure at least one exit
+    # Choose a Vault room (by arch tag) that can be sealed without walling anything else off:
+    # not the start and not a cut vertex, so gating every vault exit leaves the rest connected
+    cuts, _, _ = _lowlink(adj, start)
     vault_id = None
     for rid, r in rooms.items():
-        if f"arch:{T['vault_arch']}" in r.tags:
+        if rid != start and rid not in cuts and f"arch:{T['vault_arch']}" in r.tags:
             vault_id = rid
             break
     if not vault_id:
-        vault_id = ids[-1]
+        vault_id = next(rid for rid in reversed(ids) if rid != start and rid not in cuts)
         rooms[vault_id].name = "Vault"
         if f"arch:{T['vault_arch']}" not in rooms[vault_id].tags:
-            rooms[vault_id].tags.append(f"arch:{T['vault_arch']}")
-        rooms[vault_id].base_desc = f"A {rng.choice(['cold', 'sealed'])} vault."
-
-    if not rooms[vault_id].exits:
-        other = rng.choice([i for i in ids if i != vault_id])
-        _connect(rooms[vault_id], rooms[other], rng, allowed_dirs=H_DIRS)
+            rooms[vault_id].add_tag(f"arch:{T['vault_arch']}")
+        rooms[vault_id].base_desc = f"A {rng_rooms.choice(['cold', 'sealed'])} vault."
 
     # Place a visible goal fixture in the vault (flavor, non-portable)
     rooms[vault_id].items.append(T["vault_fixture"])
 
-    # Keys (1-based), theme display + tags "key:<prefix><n>"
-    keys = []
-    for number in (1, 2):
+    # Goal gate: every Vault exit needs the 3 artifacts
+    for d in rooms[vault_id].exits:
+        _lock(rooms, vault_id, d, "goal:artifacts3")
+
+    # Key locks go on bridges, each key in the region reachable before its lock
+    plan = _plan_locks(rooms, adj, start, vault_id, n_keys, rng_locks, rng_items)
+    for number, (lock_rid, lock_dir, key_rid) in enumerate(plan, start=1):
         key_tag = f"{T['key_prefix']}{number}"  # e.g., key:rune1 / key:keycard1 / key:rusted1
-        key_item = Item(
+        _lock(rooms, lock_rid, lock_dir, key_tag)
+        rooms[key_rid].items.append(Item(
             name=T["key_display"](number),
             tags=[key_tag, "key"],
             description="It fits something around here.",
-        )
-        keys.append((key_tag, key_item))
-
-    # Place keys in early rooms
-    early = ids[: max(3, n_rooms // 3)]
-    for _, item in keys:
-        rooms[random.choice(early)].items.append(item)
-
-    # Lock two exits and assign key tags
-    locked_assigned = 0
-    for rid in ids:
-        if locked_assigned >= 2:
-            break
-        for d, ex in list(rooms[rid].exits.items()):
-            if locked_assigned >= 2:
-                break
-            if not ex.locked:
-                tag, _ = keys[locked_assigned]
-                ex.locked = True
-                ex.key_tag = tag
-                # lock reverse
-                rev = _reverse_exit(rooms, rid, d)
-                if rev:
-                    rev.locked = True
-                    rev.key_tag = tag
-                locked_assigned += 1
+        ))
 
     # Add a theme note near each key
     for rid, room in rooms.items():
         for it in list(room.items):
-            if any(t.startswith("key:") for t in it.tags):
+            if VOCAB.has(it.mask, "key"):
                 hint_dir = None
                 for d, ex in room.exits.items():
                     if ex.locked:
@@ -207,19 +202,10 @@ def make_world(seed=None, n_rooms=12, theme="fantasy") -> World:
                 room.items.append(note)
                 break
 
-    # Lock one Vault exit with goal gate requiring 3 artifacts
-    for d, ex in rooms[vault_id].exits.items():
-        ex.locked = True
-        ex.key_tag = "goal:artifacts3"
-        rev = _reverse_exit(rooms, vault_id, d)
-        if rev:
-            rev.locked = True
-            rev.key_tag = "goal:artifacts3"
-        break
-
-    # Place 3 artifacts (theme-specific) in non-vault rooms
+    # Place 3 artifacts (theme-specific) in non-vault rooms; all of them are
+    # reachable once every key lock is open, since the vault is not a cut vertex
     artifact_rooms = [rid for rid in ids if rid != vault_id]
-    random.shuffle(artifact_rooms)
+    rng_items.shuffle(artifact_rooms)
     for name, rid in zip(T["artifact_names"], artifact_rooms[:3]):
         rooms[rid].items.append(
             Item(
@@ -232,24 +218,46 @@ def make_world(seed=None, n_rooms=12, theme="fantasy") -> World:
     world = World(
         rooms=rooms,
         start=start,
-        seed=random.randint(0, 1_000_000),
+        seed=seed,
         theme=theme,
     )
 
-    _ensure_solvable(world)
+    world.layout = _layout(world)
+    if store is not None:
+        store.adopt(world)
+    metrics.WORLDGEN.observe(time.perf_counter() - t0)
     return world
 
 
+def ensure_layout(world: World):
+    """Return the world's grid layout, computing and caching it on first use."""
+    if world.layout:
+        metrics.CACHE_HITS.inc(label="layout")
+    else:
+        metrics.CACHE_MISSES.inc(label="layout")
+        world.layout = _layout(world)
+    return world.layout
+
+
+def _phase_rng(seed, phase):
+    """Independent RNG for one generation phase; str seeding is stable across processes."""
+    return random.Random(f"{seed}:{phase}")
+
+
 # ---------- connection helpers ----------
 
 def _connect(a, b, rng, allowed_dirs=H_DIRS):
-    da = _pick_dir(a, rng, allowed_dirs)
-    db = _opp_dir(da)
-    if da is None:
+    """Link a<->b both ways, preferring opposite directions. Never overwrites an exit."""
+    if any(ex.to == b.id for ex in a.exits.values()):
         return
-    if db is None:
-        # if opposite isn't available on target, try any allowed
-        db = _pick_dir(b, rng, allowed_dirs) or "south"
+    pairs = [(d, _opp_dir(d)) for d in allowed_dirs if d not in a.exits and _opp_dir(d) not in b.exits]
+    if pairs:
+        da, db = rng.choice(pairs)
+    else:
+        # no opposite pair free: any free direction on each side (the layout absorbs the bend)
+        da, db = _pick_dir(a, rng, allowed_dirs), _pick_dir(b, rng, allowed_dirs)
+        if da is None or db is None:
+            return
     a.exits[da] = Exit(to=b.id)
     b.exits[db] = Exit(to=a.id)
 
@@ -257,6 +265,8 @@ def _connect_specific(a, b, dir_a, dir_b):
     """Try to connect a->b using specific directions, if both are free."""
     if dir_a in a.exits or dir_b in b.exits:
         return False
+    if any(ex.to == b.id for ex in a.exits.values()):
+        return False
     a.exits[dir_a] = Exit(to=b.id)
     b.exits[dir_b] = Exit(to=a.id)
     return True
@@ -295,102 +305,168 @@ def _reverse_exit(rooms, rid_from, dir_from):
     return None
 
 
-# ---------- solvability helpers ----------
-
-def _reachable_without_locks(world: World):
-    """Rooms reachable from start if locked exits are walls."""
-    seen = {world.start}
-    q = deque([world.start])
-    while q:
-        rid = q.popleft()
-        for ex in world.rooms[rid].exits.values():
-            if ex.locked:
-                continue
-            nid = ex.to
-            if nid not in seen:
-                seen.add(nid)
-                q.append(nid)
-    return seen
-
-def _key_locations(world: World):
-    """Map key_tag -> (room_id, item_ref)."""
-    loc = {}
-    for rid, room in world.rooms.items():
-        for it in room.items:
-            for t in it.tags:
-                if t.startswith("key:"):
-                    loc[t] = (rid, it)
-    return loc
-
-def _locked_key_tags(world: World):
-    """Set of key tags used by locked exits (ignore goal gate)."""
-    tags = set()
-    for room in world.rooms.values():
-        for ex in room.exits.values():
-            if ex.locked and ex.key_tag and ex.key_tag.startswith("key:"):
-                tags.add(ex.key_tag)
-    return tags
-
-def _unlock_one_exit_in_start_if_needed(world: World):
-    """Ensure start room has at least one unlocked exit."""
-    start_room = world.rooms[world.start]
-    if any(not ex.locked for ex in start_room.exits.values()):
-        return
-    d, ex = next(iter(start_room.exits.items()))
-    ex.locked = False
-    rev = _reverse_exit(world.rooms, world.start, d)
+def _lock(rooms, rid, d, key_tag):
+    """Lock exit `d` of `rid` and its twin with `key_tag`."""
+    ex = rooms[rid].exits[d]
+    ex.locked = True
+    ex.key_tag = key_tag
+    rev = _reverse_exit(rooms, rid, d)
     if rev:
-        rev.locked = False
+        rev.locked = True
+        rev.key_tag = key_tag
+
+
+# ---------- lock planning ----------
 
-def _ensure_solvable(world: World):
+def _adjacency(rooms):
+    """Undirected graph: room id -> [(neighbour id, exit dir)]; exits are always paired."""
+    return {rid: [(ex.to, d) for d, ex in r.exits.items()] for rid, r in rooms.items()}
+
+def _lowlink(adj, root, skip=None):
+    """
+    Iterative Tarjan DFS from `root`, ignoring room `skip`.
+    Returns (cut vertices, bridges as {child: (parent, dir)}, preorder index).
+    Linear in rooms + exits.
+    """
+    order = {root: 0}
+    low = {root: 0}
+    cuts, bridges = set(), {}
+    root_children = 0
+    stack = [(root, None, iter(adj[root]))]
+    while stack:
+        u, parent, it = stack[-1]
+        advanced = False
+        for v, d in it:
+            if v == skip or v == parent:
+                continue
+            if v in order:
+                low[u] = min(low[u], order[v])
+                continue
+            order[v] = low[v] = len(order)
+            stack.append((v, u, iter(adj[v])))
+            advanced = True
+            break
+        if advanced:
+            continue
+        stack.pop()
+        if parent is None:
+            continue
+        low[parent] = min(low[parent], low[u])
+        if low[u] > order[parent]:
+            bridges[u] = (parent, next(d for w, d in adj[parent] if w == u))
+        if low[u] >= order[parent]:
+            if parent == root:
+                root_children += 1
+            else:
+                cuts.add(parent)
+    if root_children > 1:
+        cuts.add(root)
+    return cuts, bridges, order
+
+def _plan_locks(rooms, adj, start, vault_id, n_keys, rng_locks, rng_items):
     """
-    - Start room has an unlocked exit.
-    - Every key-locked exit's key is reachable without crossing locked exits.
-    - Keys for any locked exits in start room are placed in start.
+    Choose up to `n_keys` bridges (outside the vault) to lock and where each key goes.
+    Locks are opened nearest-first (BFS depth of the gated side), so every lock's
+    parent side is reachable once the earlier ones are open; each key lands in the region opened by the lock before
+    it (or anywhere reachable, for the first), which chains the puzzles.
+    Returns [(room id, exit dir, key room id)] in key order. Linear in rooms + exits.
     """
-    _unlock_one_exit_in_start_if_needed(world)
+    _, bridges, _ = _lowlink(adj, start, skip=vault_id)
+    # a lock right at a dead-end start would just put its key at your feet
+    start_deg = sum(1 for v, _ in adj[start] if v != vault_id)
+    cands = sorted(c for c, (p, _) in bridges.items() if p != start or start_deg > 1)
+    if len(cands) < n_keys:
+        cands += sorted(c for c in bridges if c not in cands)
+    chosen = rng_locks.sample(cands, min(n_keys, len(cands)))
+    depth = _depths(adj, start, vault_id)
+    chosen.sort(key=lambda c: (depth[c], c))
+
+    gated = set(chosen)  # child side of each locked bridge
+    region = set()
+    fresh = _flood(adj, start, region, gated, vault_id)
+    plan = []
+    for child in chosen:
+        parent, d = bridges[child]
+        key_rid = rng_items.choice(sorted(fresh))
+        plan.append((parent, d, key_rid))
+        gated.discard(child)
+        fresh = _flood(adj, child, region, gated, vault_id)
+    return plan
+
+def _depths(adj, root, skip):
+    """BFS depth of every room reachable from `root` without entering `skip`."""
+    depth = {root: 0}
+    q = deque([root])
+    while q:
+        u = q.popleft()
+        for v, _ in adj[u]:
+            if v not in depth and v != skip:
+                depth[v] = depth[u] + 1
+                q.append(v)
+    return depth
+
+def _flood(adj, root, seen, gated, skip):
+    """Rooms newly reachable from `root` without entering `gated` rooms or `skip`; grows `seen`."""
+    seen.add(root)
+    new = [root]
+    q = deque(new)
+    while q:
+        u = q.popleft()
+        for v, _ in adj[u]:
+            if v in seen or v in gated or v == skip:
+                continue
+            seen.add(v)
+            new.append(v)
+            q.append(v)
+    return new
 
-    reachable = _reachable_without_locks(world)
-    key_loc = _key_locations(world)
-    needed_tags = _locked_key_tags(world)
 
-    # Move unreachable keys into start
-    for tag in needed_tags:
-        if tag not in key_loc:
-            continue
-        rid, item = key_loc[tag]
-        if rid not in reachable:
-            try:
-                world.rooms[rid].items.remove(item)
-            except ValueError:
-                pass
-            world.rooms[world.start].items.append(item)
-
-    # Ensure keys for locks in start are in start
-    start_room = world.rooms[world.start]
-    start_lock_tags = {
-        ex.key_tag
-        for ex in start_room.exits.values()
-        if ex.locked and ex.key_tag and ex.key_tag.startswith("key:")
-    }
-    key_loc = _key_locations(world)  # refresh
-    for tag in start_lock_tags:
-        if tag not in key_loc:
-            # create it if missing (shouldn't happen)
-            prefix = THEMES[world.theme]["key_prefix"]
-            number = tag.split(prefix)[-1]
-            item = Item(
-                name=THEMES[world.theme]["key_display"](number),
-                tags=[tag, "key"],
-                description="It fits something around here.",
-            )
-            world.rooms[world.start].items.append(item)
-        else:
-            rid, item = key_loc[tag]
-            if rid != world.start:
-                try:
-                    world.rooms[rid].items.remove(item)
-                except ValueError:
-                    pass
-                world.rooms[world.start].items.append(item)
+# ---------- layout helpers ----------
 
+def _layout(world: World):
+    """
+    Give every room a collision-free (x, y, z), once, breadth-first from start.
+    Rooms follow their exit's direction when that cell is free; otherwise
+    (non-opposite links, loops that don't close on the grid) they take the
+    nearest free cell on the same level.
+    """
+    pos = {world.start: (0, 0, 0)}
+    taken = {(0, 0, 0)}
+    order = [world.start] + [rid for rid in world.rooms if rid != world.start]
+    for root in order:
+        if root not in pos:
+            # disconnected room: park it beside everything else
+            cell = _free_cell(taken, (max(x for x, _, _ in taken) + 2, 0, 0))
+            pos[root] = cell
+            taken.add(cell)
+        q = deque([root])
+        while q:
+            rid = q.popleft()
+            x, y, z = pos[rid]
+            exits = world.rooms[rid].exits
+            for d in DIRECTIONS:
+                ex = exits.get(d)
+                if not ex or ex.to in pos:
+                    continue
+                dx, dy, dz = DIR_DELTAS[d]
+                cell = _free_cell(taken, (x + dx, y + dy, z + dz))
+                pos[ex.to] = cell
+                taken.add(cell)
+                q.append(ex.to)
+    return pos
+
+def _free_cell(taken, want):
+    """`want` if free, else the nearest free cell on its level (ring by ring)."""
+    if want not in taken:
+        return want
+    x, y, z = want
+    r = 1
+    while True:
+        for dy in range(-r, r + 1):
+            for dx in range(-r, r + 1):
+                if max(abs(dx), abs(dy)) != r:
+                    continue
+                cell = (x + dx, y + dy, z)
+                if cell not in taken:
+                    return cell
+        r += 1
@@ -0,0 +1,100 @@
+"""
+The player's inventory: a list of `Item`s that keeps its own tallies.
+
+`Inventory` behaves (and serializes) exactly like the plain list it
+replaces, but every add or remove also updates:
+
+- `key_tags`: Counter of held key:* tags (a tag stays while any item has it)
+- `artifacts`: number of artifact items
+- `ns_counts`: Counter of items per tag namespace (key, artifact, note, ...)
+
+so "can I open this?" is a set lookup instead of a scan over items and tags.
+"""
+from collections import Counter
+
+from adventure.engine.tags import VOCAB, NAMESPACES
+
+
+class Inventory(list):
+    def __init__(self, items=()):
+        super().__init__()
+        self.key_tags = Counter()
+        self.ns_counts = Counter()
+        self.extend(items)
+
+    @property
+    def artifacts(self) -> int:
+        return self.ns_counts["artifact"]
+
+    def holds_key(self, key_tag) -> bool:
+        return key_tag in self.key_tags
+
+    # ---------- list protocol, keeping the tallies in step ----------
+
+    def append(self, item):
+        super().append(item)
+        self._count(item, 1)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._count(item, 1)
+
+    def remove(self, item):
+        super().remove(item)
+        self._count(item, -1)
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._count(item, -1)
+        return item
+
+    def __delitem__(self, index):
+        gone = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for item in gone:
+            self._count(item, -1)
+
+    def __setitem__(self, index, value):
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        super().__setitem__(index, value)
+        new = value if isinstance(index, slice) else [value]
+        for item in old:
+            self._count(item, -1)
+        for item in new:
+            self._count(item, 1)
+
+    def clear(self):
+        super().clear()
+        self.key_tags.clear()
+        self.ns_counts.clear()
+
+    def copy(self):
+        return Inventory(self)
+
+    def __reduce__(self):
+        # rebuild through __init__ so copy/deepcopy/pickle recount the tallies once
+        return Inventory, (list(self),)
+
+    def _count(self, item, sign):
+        mask = item.mask
+        for ns in NAMESPACES:
+            if VOCAB.has(mask, ns):
+                _bump(self.ns_counts, ns, sign)
+        for tag in VOCAB.tags_of(mask, "key"):
+            _bump(self.key_tags, tag, sign)
+
+
+def _bump(counter, key, sign):
+    n = counter[key] + sign
+    if n > 0:
+        counter[key] = n
+    else:
+        del counter[key]
@@ -1,25 +1,80 @@
+from collections import deque
 from dataclasses import dataclass, field
-import json
+import time
 from typing import Any
 
 from adventure.engine.gen import make_world
 from adventure.engine.parser import parse
 from adventure.engine.actions import (
     do_go, do_inventory, do_look, do_take, do_use,
-    do_debug, do_examine, do_read, do_map
+    do_debug, do_examine, do_read, do_map, do_hint, do_undo, _revert
 )
-from adventure.engine.save import save_game, load_state
+from adventure.engine.save import save_game, load_state, read_save
+from adventure.engine.slots import DEFAULT_DIR, slots
+from adventure.engine.autosave import Autosaver
+from adventure.engine.spatial import MapCoords
+from adventure.engine.ticks import Ticker
+from adventure.engine.inventory import Inventory
 from adventure.engine.world import Item
+from adventure.engine import metrics
 
 @dataclass
 class GameState:
     world: Any
     room: Any
-    inv: list = field(default_factory=list)
+    inv: list = field(default_factory=Inventory)     # list of Items with key/artifact tallies
     score: int = 0
     turns: int = 0
-    map_coords: dict = field(default_factory=dict)   # NEW
+    map_coords: dict = field(default_factory=MapCoords)  # rid -> (x, y, z), chunk-indexed
     map_pos: tuple = (0, 0, 0)                       # NEW
+    over: bool = False                               # set by `quit`
+    progress: Any = field(default=None, repr=False, compare=False)  # see progress_of
+    undo_limit: int = 1000                           # turns kept for `undo`
+    history: Any = field(default=None, repr=False, compare=False)
+    changes: Any = field(default=None, repr=False, compare=False)  # this turn's inverse ops
+    journaled: int = field(default=0, repr=False, compare=False)
+    ticks: Any = field(default=None, repr=False, compare=False)  # Ticker, with --ticks
+    saves_dir: Any = field(default=None, repr=False, compare=False)  # for `save <slot>`; None = DEFAULT_DIR
+
+    def __post_init__(self):
+        metrics.track_session(self)
+        if not isinstance(self.inv, Inventory):
+            self.inv = Inventory(self.inv)
+        self.history = deque(maxlen=max(0, self.undo_limit))
+
+    def begin_turn(self):
+        """Open a journal entry: the scalars now, plus room for this turn's changes."""
+        self.changes = []
+        self.history.append((self.room, self.score, self.turns, self.map_pos, self.over, self.changes))
+        self.journaled += 1
+
+    def snapshot(self) -> int:
+        """A mark to `rollback` to later; costs nothing until then."""
+        return self.journaled
+
+    def rollback(self, mark: int) -> int:
+        """Undo every turn since `snapshot()` returned `mark`; returns turns undone."""
+        n = self.journaled - mark
+        if n < 0 or n > len(self.history):
+            raise ValueError("snapshot is no longer in the undo history")
+        return self.undo(n)
+
+    def undo(self, n=1) -> int:
+        """Revert the last `n` turns (fewer if the history is shorter); returns turns undone."""
+        n = min(n, len(self.history))
+        for _ in range(n):
+            self.room, self.score, self.turns, self.map_pos, self.over, changes = self.history.pop()
+            for op in reversed(changes):
+                _revert(self, op)
+            self.journaled -= 1
+        if n:
+            self.changes = None
+            self.progress = None  # union-find can't split; rebuilt on next use
+        return n
+
+    def apply(self, commands, join=False):
+        """Run commands in order without touching stdout; see `execute_batch`."""
+        return execute_batch(self, commands, join=join)
 
 def _prompt_theme():
     while True:
@@ -29,73 +84,150 @@ def _prompt_theme():
             return sel
         print("Please type: fantasy, scifi, or horror.")
 
-def start_game(seed=None, theme=None, rooms=15):
+HELP = "Commands: look/l, go <dir>, n/s/e/w/u/d, take <item>, use/unlock [<item>] [on <dir>], examine/x <item>, read <item>, inventory/i, map [all] [radius<=64], hint, undo [n], save [slot], load, quit, debug"
+
+def new_game(seed=None, theme="fantasy", rooms=15, ticks=False):
+    """Fresh world and state, mapping initialized at the start room."""
+    return enter_world(make_world(seed=seed, n_rooms=rooms, theme=theme), ticks=ticks)
+
+def enter_world(world, score=0, turns=0, ticks=False):
+    """A GameState standing at `world`'s start (score and turns carried in, e.g. by a campaign)."""
+    gs = GameState(world=world, room=world.rooms[world.start], score=score, turns=turns)
+    if ticks:
+        gs.ticks = Ticker(world, start=turns)
+    # init mapping at the start room's layout position (the origin)
+    gs.map_pos = world.layout[gs.room.id]
+    gs.map_coords[gs.room.id] = gs.map_pos
+    return gs
+
+def start_game(seed=None, theme=None, rooms=15, autosave=None, ticks=False):
     theme = theme or _prompt_theme()
-    world = make_world(seed=seed, n_rooms=rooms, theme=theme)
-    gs = GameState(world=world, room=world.rooms[world.start])
-    # init mapping at origin
-    gs.map_coords[gs.room.id] = (0, 0, 0)
-    gs.map_pos = (0, 0, 0)
+    gs = new_game(seed=seed, theme=theme, rooms=rooms, ticks=ticks)
 
-    print(banner(world.seed, theme=world.theme))
+    print(banner(gs.world.seed, theme=gs.world.theme))
     print(do_look(gs))
-    loop(gs)
+    loop(gs, autosave=autosave)
 
-def load_game(file):
-    with open(file) as f:
-        data = json.load(f)
+def restore_game(data):
+    """Rebuild a GameState from `save_game` data: regenerate the world, then apply state."""
+    t0 = time.perf_counter()
     theme = data.get("theme", "fantasy")
     n_rooms = int(data.get("n_rooms", 15))
     world = make_world(seed=data["seed"], n_rooms=n_rooms, theme=theme)
 
     gs = GameState(world=world, room=world.rooms[data["room"]])
     gs.score = data.get("score", 0)
-    gs.inv = [Item(**it) for it in data.get("inv", [])]
+    gs.turns = data.get("turns", 0)
+    gs.inv = Inventory(Item(**it) for it in data.get("inv", []))
     load_state(world, data)
 
-    # mapping starts at origin for the loaded room; it will fill as you move
-    gs.map_coords[gs.room.id] = (0, 0, 0)
-    gs.map_pos = (0, 0, 0)
+    # layout is fixed per world, so every room seen before the save is back on the map
+    gs.map_coords = MapCoords({rid: world.layout[rid] for rid, r in world.rooms.items() if r.seen})
+    gs.map_pos = world.layout[gs.room.id]
+    gs.map_coords[gs.room.id] = gs.map_pos
+    metrics.LOAD_SECONDS.observe(time.perf_counter() - t0)
+    return gs
+
+def load_game(file=None, slot=None, saves_dir=None, autosave=None, ticks=False):
+    data = slots(saves_dir or DEFAULT_DIR).read(slot) if slot else read_save(file)
+    gs = restore_game(data)
+    gs.saves_dir = saves_dir
+    if ticks:
+        gs.ticks = Ticker(gs.world, start=gs.turns)  # the schedule isn't saved; start afresh
 
-    print(banner(world.seed, loaded=True, theme=world.theme))
+    print(banner(gs.world.seed, loaded=True, theme=gs.world.theme))
     print(do_look(gs))
-    loop(gs)
+    loop(gs, autosave=autosave)
 
-def loop(gs):
-    while True:
-        cmd = input("\n> ").strip()
-        verb, args = parse(cmd)
-        gs.turns += 1
-        if verb == "help":
-            print("Commands: look/l, go <dir>, n/s/e/w/u/d, take <item>, use/unlock [<item>] [on <dir>], examine/x <item>, read <item>, inventory/i, map [all], save, load, quit, debug")
-            continue
-        if verb == "look":
-            print(do_look(gs)); continue
-        if verb == "inventory":
-            print(do_inventory(gs)); continue
-        if verb == "go":
-            print(do_go(gs, args.get("dir",""))); continue
-        if verb == "take":
-            print(do_take(gs, args.get("item",""))); continue
-        if verb == "use":  # unlock handled here too
-            print(do_use(gs, args.get("item",""), args.get("target",""))); continue
-        if verb == "examine":
-            print(do_examine(gs, args.get("item",""))); continue
-        if verb == "read":
-            print(do_read(gs, args.get("item",""))); continue
-        if verb == "map":
-            print(do_map(gs, args.get("rest",""))); continue
-        if verb == "save":
-            print(save_game(gs)); continue
-        if verb == "load":
-            print("Use the CLI: infoprox load save.json"); continue
-        if verb == "quit":
-            print(f"Score: {gs.score}  Turns: {gs.turns}"); break
-        if verb == "debug":
-            print(do_debug(gs)); continue
-        if verb == "unknown":
-            print("I don't understand that."); continue
-        print("...")
+def step(gs, cmd: str):
+    """Run one command against `gs`; returns (verb, output text)."""
+    verb, args = parse(cmd)
+    metrics.TURNS.inc()
+    metrics.COMMANDS.inc(label=verb)
+    if verb == "undo":
+        return verb, do_undo(gs, args.get("rest", ""))
+    gs.begin_turn()
+    gs.turns += 1
+    text = _dispatch(gs, verb, args)
+    if gs.ticks is not None and not gs.over:
+        events = gs.ticks.advance(gs)
+        if events:
+            text += "\n" + "\n".join(events)
+    return verb, text
+
+def _dispatch(gs, verb, args):
+    if verb == "help":
+        return HELP
+    if verb == "look":
+        return do_look(gs)
+    if verb == "inventory":
+        return do_inventory(gs)
+    if verb == "go":
+        return do_go(gs, args.get("dir",""))
+    if verb == "take":
+        return do_take(gs, args.get("item",""))
+    if verb == "use":  # unlock handled here too
+        return do_use(gs, args.get("item",""), args.get("target",""))
+    if verb == "examine":
+        return do_examine(gs, args.get("item",""))
+    if verb == "read":
+        return do_read(gs, args.get("item",""))
+    if verb == "map":
+        return do_map(gs, args.get("rest",""))
+    if verb == "hint":
+        return do_hint(gs)
+    if verb == "save":
+        slot = args.get("rest", "")
+        if not slot:
+            return save_game(gs)
+        try:
+            return slots(gs.saves_dir or DEFAULT_DIR).save(gs, slot)
+        except ValueError as e:
+            return str(e)
+    if verb == "load":
+        return "Use the CLI: infoprox load save.json (or: infoprox load --slot NAME)"
+    if verb == "quit":
+        gs.over = True
+        return f"Score: {gs.score}  Turns: {gs.turns}"
+    if verb == "debug":
+        return do_debug(gs)
+    if verb == "unknown":
+        return "I don't understand that."
+    return "..."
+
+def execute_batch(gs, commands, join=False):
+    """
+    Run a list of command strings (or one string) against `gs`.
+    Returns one output per command run, or a single newline-joined buffer with
+    join=True. Commands after a `quit` are not run.
+    """
+    if isinstance(commands, str):
+        commands = [commands]
+    out = []
+    for cmd in commands:
+        if gs.over:
+            break
+        out.append(step(gs, cmd)[1])
+    return "\n".join(out) if join else out
+
+def loop(gs, autosave=None):
+    """Read-eval-print until quit. With `autosave` (a path), every turn is saved there in the background."""
+    saver = Autosaver() if autosave else None
+    try:
+        while not gs.over:
+            print(gs.apply(input("\n> ").strip(), join=True))
+            if saver:
+                saver.request(id(gs), gs, autosave)
+                report_autosave(saver)
+    finally:
+        if saver:
+            saver.close()  # writes the last pending snapshot, even on Ctrl-C / EOF
+            report_autosave(saver)
+
+def report_autosave(saver):
+    """Tell the player, once per path, about autosaves that could not be written."""
+    for msg in saver.new_errors():
+        print(msg)
 
 def banner(seed, loaded=False, theme="fantasy"):
     state = "Loaded game." if loaded else "New game."
@@ -0,0 +1,200 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Updating a metric is a dict add under the metric's lock, so the per-turn
+cost stays a few attribute lookups; rendering copies values under the same
+lock, so game, autosave and exporter threads can share a registry. Derived values (sessions, memory) are computed only when
+the registry is rendered. Expose with `write_textfile` (node_exporter
+textfile style), `start_textfile_writer`, or `serve` (GET /metrics).
+"""
+import atexit
+import os
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.label = label  # single label name, or None
+        self.values = {}    # label value (None when unlabeled) -> number
+        self._lock = threading.Lock()
+        if label is None:
+            self.values[None] = 0
+
+    def samples(self):
+        with self._lock:
+            values = list(self.values.items())
+        for lv, v in values:
+            yield self.name, lv, v
+
+    def value(self, label=None):
+        return self.values.get(label, 0)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, label=None):
+        v = self.values
+        with self._lock:
+            v[label] = v.get(label, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, label=None, fn=None):
+        super().__init__(name, help, label)
+        self.fn = fn  # optional callable evaluated at render time; replaces the stored value
+        if fn is not None:
+            self.values.clear()
+
+    def set(self, value, label=None):
+        with self._lock:
+            self.values[label] = value
+
+    def samples(self):
+        if self.fn is not None:
+            yield self.name, None, self.fn()
+        yield from super().samples()
+
+
+class Summary(_Metric):
+    """Count and sum of observations (no quantiles), e.g. durations or sizes."""
+    kind = "summary"
+
+    def __init__(self, name, help, label=None):
+        super().__init__(name, help, label)
+        self.sums = {None: 0.0} if label is None else {}
+
+    def observe(self, value, label=None):
+        with self._lock:
+            self.values[label] = self.values.get(label, 0) + 1
+            self.sums[label] = self.sums.get(label, 0.0) + value
+
+    def samples(self):
+        with self._lock:
+            values = [(lv, n, self.sums[lv]) for lv, n in self.values.items()]
+        for lv, n, total in values:
+            yield self.name + "_count", lv, n
+            yield self.name + "_sum", lv, total
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            return self.metrics[metric.name]
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, label=None):
+        return self._add(Counter(name, help, label))
+
+    def gauge(self, name, help, label=None, fn=None):
+        return self._add(Gauge(name, help, label, fn))
+
+    def summary(self, name, help, label=None):
+        return self._add(Summary(name, help, label))
+
+    def render(self) -> str:
+        out = []
+        for m in list(self.metrics.values()):
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.kind}")
+            for name, lv, v in m.samples():
+                labels = f'{{{m.label}="{_escape(lv)}"}}' if m.label and lv is not None else ""
+                out.append(f"{name}{labels} {_num(v)}")
+        return "\n".join(out) + "\n"
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+REGISTRY = Registry()
+
+# ---------- sessions & memory (computed at scrape time) ----------
+
+_sessions = weakref.WeakValueDictionary()  # id -> GameState (dataclass eq makes it unhashable)
+
+def track_session(gs):
+    """Count `gs` as active until it is garbage-collected."""
+    _sessions[id(gs)] = gs
+
+def resident_bytes() -> int:
+    """Current RSS of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+SESSIONS = REGISTRY.gauge("infoprox_sessions_active", "Game sessions currently in memory.",
+                          fn=lambda: len(_sessions))
+REGISTRY.gauge("infoprox_resident_bytes", "Resident memory of the engine process.", fn=resident_bytes)
+REGISTRY.gauge("infoprox_resident_bytes_per_session", "Resident memory divided by active sessions.",
+               fn=lambda: resident_bytes() / max(1, len(_sessions)))
+
+# ---------- engine metrics ----------
+
+TURNS = REGISTRY.counter("infoprox_turns_total", "Commands processed (rate() gives turns per second).")
+COMMANDS = REGISTRY.counter("infoprox_commands_total", "Commands processed, by parsed verb.", label="verb")
+WORLDGEN = REGISTRY.summary("infoprox_worldgen_seconds", "Time spent in make_world.")
+SAVE_SECONDS = REGISTRY.summary("infoprox_save_seconds", "Time spent writing saves.")
+SAVE_BYTES = REGISTRY.counter("infoprox_save_bytes_total", "Bytes written by saves.")
+LOAD_SECONDS = REGISTRY.summary("infoprox_load_seconds", "Time spent restoring saves, regeneration included.")
+LOAD_BYTES = REGISTRY.counter("infoprox_load_bytes_total", "Bytes read from saves.")
+CACHE_HITS = REGISTRY.counter("infoprox_cache_hits_total", "Cache hits, by cache.", label="cache")
+CACHE_MISSES = REGISTRY.counter("infoprox_cache_misses_total", "Cache misses, by cache.", label="cache")
+
+# ---------- exposition ----------
+
+def write_textfile(path, registry=REGISTRY):
+    """Atomically write the registry to `path` (scrape-able textfile)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+def start_textfile_writer(path, interval=5.0, registry=REGISTRY):
+    """Rewrite `path` every `interval` seconds from a daemon thread, and once at exit."""
+    def run():
+        while True:
+            time.sleep(interval)
+            write_textfile(path, registry)
+    threading.Thread(target=run, name="metrics-textfile", daemon=True).start()
+    atexit.register(write_textfile, path, registry)
+
+def serve(port, host="127.0.0.1", registry=REGISTRY):
+    """Serve GET /metrics on a daemon thread; returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
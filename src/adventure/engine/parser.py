@@ -9,6 +9,8 @@ VERBS = {
     "use": ["use", "unlock", "open"],
     "read": ["read"],
     "map": ["map"],             # NEW
+    "hint": ["hint", "progress"],
+    "undo": ["undo"],
     "help": ["help", "?"],
     "save": ["save"],
     "load": ["load"],
@@ -49,7 +51,7 @@ def _args_for(verb, rest):
             rest = DIR_SYNONYMS[rest]
         return {"dir": rest}
 
-    if verb in ("look", "inventory", "help", "quit", "save", "load", "debug", "map"):
+    if verb in ("look", "inventory", "help", "quit", "save", "load", "debug", "map", "hint", "undo"):
         return {"rest": rest}
 
     if verb in ("examine", "read"):
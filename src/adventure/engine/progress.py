@@ -0,0 +1,185 @@
+"""
+Incremental reachability for hints and bots.
+
+`Progress` keeps the rooms connected by open exits as union-find components.
+It is built once per game (one pass over rooms and exits). After that an
+unlock is one `union`, a take adjusts one counter, and "what is still
+reachable" is answered from the component of the current room instead of a
+BFS over the world.
+
+Each component remembers:
+- its rooms
+- the useful items on its floor (keys and artifacts), by room
+- the locked exits leaving it
+
+Merges fold the smaller component into the larger one, so every room and
+lock moves O(log n) times over a whole game.
+
+    p = progress_of(gs)
+    p.reachable(gs.room.id, world.start), p.loot_rooms(gs), p.openable(gs), p.can_finish(gs)
+"""
+from adventure.engine.tags import VOCAB
+
+GOAL_TAG = "goal:artifacts3"
+
+
+class Progress:
+    def __init__(self, world):
+        self.world = world
+        self.parent = {}  # rid -> parent rid (roots map to themselves)
+        self.size = {}    # root -> room count
+        self.rooms = {}   # root -> [rid]
+        self.loot = {}    # root -> {rid: useful items on the floor}
+        self.locks = {}   # root -> [(rid, dir)] locked exits, some maybe internal by now
+        self.gates = []   # (rid, dir) of every goal gate exit
+        useful = VOCAB.ns_mask("key") | VOCAB.ns_mask("artifact")
+        pending = []
+        for rid, room in world.rooms.items():
+            self.parent[rid] = rid
+            self.size[rid] = 1
+            self.rooms[rid] = [rid]
+            n = sum(1 for it in room.items if it.portable and it.mask & useful)
+            self.loot[rid] = {rid: n} if n else {}
+            self.locks[rid] = []
+            for d, ex in room.exits.items():
+                if ex.key_tag == GOAL_TAG:
+                    self.gates.append((rid, d))
+                if ex.locked:
+                    self.locks[rid].append((rid, d))
+                else:
+                    pending.append((rid, ex.to))
+        for a, b in pending:
+            self.union(a, b)
+
+    # ---------- union-find ----------
+
+    def find(self, rid):
+        parent = self.parent
+        while parent[rid] != rid:
+            parent[rid] = parent[parent[rid]]  # path halving
+            rid = parent[rid]
+        return rid
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size.pop(rb)
+        self.rooms[ra].extend(self.rooms.pop(rb))
+        self.loot[ra].update(self.loot.pop(rb))
+        self.locks[ra].extend(self.locks.pop(rb))
+        return ra
+
+    # ---------- engine hooks ----------
+
+    def unlocked(self, a, b):
+        """Exit a <-> b was opened."""
+        self.union(a, b)
+
+    def took(self, rid, item):
+        """`item` left room `rid` for the inventory."""
+        useful = VOCAB.ns_mask("key") | VOCAB.ns_mask("artifact")
+        if not (item.mask & useful):
+            return
+        loot = self.loot[self.find(rid)]
+        if loot.get(rid, 0) <= 1:
+            loot.pop(rid, None)
+        else:
+            loot[rid] -= 1
+
+    # ---------- queries ----------
+
+    def reachable(self, a, b):
+        """Whether rooms `a` and `b` are joined by open exits right now."""
+        return self.find(a) == self.find(b)
+
+    def reachable_rooms(self, rid):
+        """Every room in the same open component as `rid`."""
+        return list(self.rooms[self.find(rid)])
+
+    def loot_rooms(self, gs):
+        """Rooms within reach that still hold a key or an artifact."""
+        return sorted(self.loot[self.find(gs.room.id)])
+
+    def frontier(self, gs):
+        """Locked exits (rid, dir) leading out of the player's component."""
+        root = self.find(gs.room.id)
+        rooms = self.world.rooms
+        live = []
+        for rid, d in self.locks[root]:
+            ex = rooms[rid].exits[d]
+            if ex.locked and self.find(ex.to) != root:
+                live.append((rid, d))
+        self.locks[root] = live  # drop exits that became internal or open
+        return live
+
+    def openable(self, gs):
+        """Frontier exits the player could unlock with what they carry."""
+        keys, artifacts = _held(gs)
+        rooms = self.world.rooms
+        return [
+            (rid, d) for rid, d in self.frontier(gs)
+            if _opens(rooms[rid].exits[d].key_tag, keys, artifacts)
+        ]
+
+    def can_finish(self, gs):
+        """
+        Whether the vault can still be opened from here, by collecting what is
+        reachable and opening locks in turn. This works over components, not
+        rooms, so it costs O(locks) in practice.
+        """
+        keys, artifacts = _held(gs)
+        rooms = self.world.rooms
+        useful = VOCAB.ns_mask("key") | VOCAB.ns_mask("artifact")
+        done = set()     # component roots already collected
+        todo = [self.find(gs.room.id)]
+        waiting = []     # (key tag, target room) behind locks not yet openable
+        while todo:
+            root = todo.pop()
+            if root in done:
+                continue
+            done.add(root)
+            for rid in self.loot[root]:
+                for it in rooms[rid].items:
+                    if it.portable and it.mask & useful:
+                        keys.update(VOCAB.tags_of(it.mask, "key"))
+                        artifacts += VOCAB.has(it.mask, "artifact")
+            for rid, d in self.locks[root]:
+                ex = rooms[rid].exits[d]
+                if ex.locked:
+                    waiting.append((ex.key_tag, ex.to))
+            still = []
+            for tag, to in waiting:
+                if _opens(tag, keys, artifacts):
+                    if tag == GOAL_TAG:
+                        return True
+                    todo.append(self.find(to))
+                else:
+                    still.append((tag, to))
+            waiting = still
+        return self.gate_open()
+
+    def gate_open(self):
+        """Whether the vault has been opened (worlds without a gate count as open)."""
+        rooms = self.world.rooms
+        return not self.gates or any(not rooms[rid].exits[d].locked for rid, d in self.gates)
+
+
+def progress_of(gs) -> Progress:
+    """The game's `Progress`, built on first use."""
+    p = gs.progress
+    if p is None:
+        p = gs.progress = Progress(gs.world)
+    return p
+
+
+def _held(gs):
+    return set(gs.inv.key_tags), gs.inv.artifacts
+
+def _opens(key_tag, keys, artifacts):
+    if key_tag == GOAL_TAG:
+        return artifacts >= 3
+    return key_tag in keys
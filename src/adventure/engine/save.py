@@ -1,30 +1,67 @@
 import json
+import os
+import time
 from dataclasses import asdict
 
+from adventure.engine import metrics
+from adventure.engine.gen import make_world
+
 def save_game(gs, filename="save.json"):
     """
     Persist minimal, theme-aware state. World structure is regenerated from seed+theme+room count.
     We store the mutable bits: current room, score, inventory, per-room seen/items/locked flags.
     """
-    data = {
+    t0 = time.perf_counter()
+    text = json.dumps(_state_dict(gs), indent=2)
+    _write_atomic(filename, text)
+    metrics.SAVE_SECONDS.observe(time.perf_counter() - t0)
+    metrics.SAVE_BYTES.inc(len(text))
+    return f"Game saved to {filename}."
+
+def _state_dict(gs):
+    """Everything `save_game` writes, as fresh plain data (safe to serialize on another thread)."""
+    return {
         "seed": gs.world.seed,
         "theme": gs.world.theme,
         "n_rooms": len(gs.world.rooms),
         "room": gs.room.id,
         "score": gs.score,
+        "turns": gs.turns,
         "inv": [asdict(i) for i in gs.inv],
-        "rooms": {
-            rid: {
-                "seen": r.seen,
-                "items": [asdict(i) for i in r.items],
-                "exits": {d: {"locked": ex.locked} for d, ex in r.exits.items()},
-            }
-            for rid, r in gs.world.rooms.items()
-        },
+        "rooms": {rid: _room_state(r) for rid, r in gs.world.rooms.items()},
     }
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=2)
-    return f"Game saved to {filename}."
+
+def _room_state(r):
+    return {
+        "seen": r.seen,
+        "items": [asdict(i) for i in r.items],
+        "exits": {d: {"locked": ex.locked} for d, ex in r.exits.items()},
+    }
+
+def snapshot_state(gs):
+    """
+    `_state_dict` without the rooms that are still exactly as generated, for
+    moving a live session between processes. `restore_game`/`load_state`
+    accept it as is: rooms left out keep their generated state.
+    """
+    data = _state_dict(gs)
+    fresh = make_world(seed=data["seed"], n_rooms=data["n_rooms"], theme=data["theme"]).rooms
+    data["rooms"] = {rid: st for rid, st in data["rooms"].items() if st != _room_state(fresh[rid])}
+    return data
+
+def _write_atomic(filename, text):
+    """Write via a temp file and rename, so readers never see a half-written save."""
+    tmp = f"{filename}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, filename)
+
+def read_save(filename):
+    """Parse a save file written by `save_game`."""
+    with open(filename) as f:
+        text = f.read()
+    metrics.LOAD_BYTES.inc(len(text))
+    return json.loads(text)
 
 def load_state(world, data):
     """
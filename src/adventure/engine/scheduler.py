@@ -0,0 +1,119 @@
+"""
+Fair turn scheduling between sessions that share one engine.
+
+Each session gets a bounded FIFO of work items `(cost, fn)`. Sessions with
+work are served by deficit round-robin: every round a session earns
+`quantum` credit and runs queued items while their cost fits its credit.
+Expensive verbs (`map all`, `save`, ...) cost more, so a client flooding
+them gets proportionally fewer turns instead of stalling everyone else.
+`submit` refuses work that would overflow a session's queue (returns False),
+which is the client's backpressure signal.
+
+    sched = Scheduler()
+    sched.submit("p1", [(command_cost("map all"), lambda: ...)])
+    while sched.wait():
+        sched.run_round()
+"""
+import threading
+import weakref
+from collections import deque
+
+from adventure.engine import metrics
+from adventure.engine.actions import map_radius
+from adventure.engine.parser import parse
+from adventure.engine.spatial import CHUNK
+
+VERB_COSTS = {"map": 4, "hint": 2, "save": 3, "load": 3}
+
+_schedulers = weakref.WeakSet()
+
+REJECTED = metrics.REGISTRY.counter("infoprox_scheduler_rejected_total",
+                                    "Work refused because a session's queue was full.")
+metrics.REGISTRY.gauge("infoprox_scheduler_queued", "Work items waiting in session queues.",
+                       fn=lambda: sum(s.queued() for s in list(_schedulers)))
+
+
+def command_cost(cmd, costs=VERB_COSTS):
+    """Scheduling weight of one command string (1 for ordinary turns)."""
+    verb, args = parse(cmd)
+    cost = costs.get(verb, 1)
+    if verb == "map":
+        words = args.get("rest", "").lower().split()
+        if "all" in words:
+            cost *= 2
+        span = map_radius(words) // CHUNK + 1  # index chunks per side of the viewport, roughly
+        cost *= span * span
+    return cost
+
+
+class Scheduler:
+    def __init__(self, queue_limit=64, quantum=4):
+        self.queue_limit = max(1, int(queue_limit))
+        self.quantum = quantum
+        self.queues = {}       # sid -> deque[(cost, fn)]; present while the session has work
+        self.deficit = {}      # sid -> unused credit
+        self.active = deque()  # sids waiting for their next round
+        self.closed = False
+        self._cond = threading.Condition()
+        _schedulers.add(self)
+
+    def queued(self, sid=None):
+        with self._cond:
+            if sid is not None:
+                return len(self.queues.get(sid, ()))
+            return sum(len(q) for q in self.queues.values())
+
+    def submit(self, sid, work) -> bool:
+        """Queue `work` ([(cost, fn)]) for `sid`, all or nothing; False if the queue would overflow."""
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("scheduler is closed")
+            q = self.queues.get(sid)
+            if len(q or ()) + len(work) > self.queue_limit:
+                REJECTED.inc()
+                return False
+            if q is None:
+                q = self.queues[sid] = deque()
+                self.deficit[sid] = 0
+                self.active.append(sid)
+            q.extend(work)
+            self._cond.notify_all()
+            return True
+
+    def wait(self, timeout=None) -> bool:
+        """Block until there is work; False once closed and drained (or on timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.active or self.closed, timeout)
+            return bool(self.active)
+
+    def close(self):
+        """Accept no more work; `wait` returns False once the queues are drained."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def run_round(self) -> int:
+        """Give every session with work one turn of credit; returns items run."""
+        with self._cond:
+            sids = list(self.active)
+            self.active.clear()
+        ran = 0
+        for sid in sids:
+            with self._cond:
+                q = self.queues[sid]
+                credit = self.deficit[sid] + self.quantum
+                batch = []
+                while q and q[0][0] <= credit:
+                    cost, fn = q.popleft()
+                    credit -= cost
+                    batch.append(fn)
+                if q:
+                    self.deficit[sid] = credit
+                    self.active.append(sid)
+                else:
+                    # an idle session keeps no credit (classic DRR)
+                    del self.queues[sid], self.deficit[sid]
+            for fn in batch:
+                fn()
+                ran += 1
+        return ran
@@ -0,0 +1,141 @@
+"""
+Session manager for long-running hosts.
+
+Sessions live in memory while active. Ones idle longer than `idle_seconds`,
+or the least recently used once more than `max_resident` are in memory,
+are hibernated: written with `save_game` and dropped. The next command for a
+hibernated session restores it with `restore_game` before running, so
+callers never see the difference.
+
+`export` and `adopt` hand a live session to another manager (another
+process) as a compact `snapshot_state` dict.
+"""
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+
+from adventure.engine import metrics
+from adventure.engine.loop import new_game, restore_game, step
+from adventure.engine.save import save_game, read_save, snapshot_state
+
+_SAFE_ID = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+
+HIBERNATED = metrics.REGISTRY.counter("infoprox_sessions_hibernated_total", "Sessions written to disk while idle.")
+MIGRATED = metrics.REGISTRY.counter("infoprox_sessions_migrated_total",
+                                    "Sessions handed to or taken from another manager, by direction.",
+                                    label="direction")
+
+
+class SessionManager:
+    def __init__(self, directory, idle_seconds=600.0, max_resident=1000, clock=time.monotonic):
+        self.directory = directory
+        self.idle_seconds = idle_seconds
+        self.max_resident = max(1, int(max_resident))
+        self.clock = clock
+        self.resident = OrderedDict()  # sid -> GameState, least recently used first
+        self.last_used = {}            # sid -> clock() of last command
+        os.makedirs(directory, exist_ok=True)
+
+    def __contains__(self, sid):
+        return sid in self.resident or os.path.exists(self._path(sid))
+
+    def __len__(self):
+        return len(self.resident)
+
+    def create(self, sid, seed=None, theme="fantasy", rooms=15):
+        """Start a new game under `sid`, replacing any previous one."""
+        self.close(sid)
+        gs = new_game(seed=seed, theme=theme, rooms=rooms)
+        self._admit(sid, gs)
+        return gs
+
+    def get(self, sid):
+        """The live GameState for `sid`, resuming it from disk if hibernated."""
+        gs = self.resident.get(sid)
+        if gs is not None:
+            metrics.CACHE_HITS.inc(label="session")
+            self.resident.move_to_end(sid)
+            self.last_used[sid] = self.clock()
+            self.sweep()
+            return gs
+        path = self._path(sid)
+        if not os.path.exists(path):
+            raise KeyError(sid)
+        metrics.CACHE_MISSES.inc(label="session")
+        gs = restore_game(read_save(path))
+        os.remove(path)
+        self._admit(sid, gs)
+        return gs
+
+    def execute(self, sid, cmd: str) -> str:
+        """Run one command in session `sid`; `quit` ends the session."""
+        gs = self.get(sid)
+        text = step(gs, cmd)[1]
+        if gs.over:
+            self.close(sid)
+        return text
+
+    def export(self, sid):
+        """Snapshot `sid` for another manager and forget it here; None if unknown."""
+        try:
+            gs = self.get(sid)
+        except KeyError:
+            return None
+        data = snapshot_state(gs)
+        self.close(sid)
+        MIGRATED.inc(label="out")
+        return data
+
+    def adopt(self, sid, data):
+        """Take over a session exported by another manager."""
+        self.close(sid)
+        gs = restore_game(data)
+        self._admit(sid, gs)
+        MIGRATED.inc(label="in")
+        return gs
+
+    def hibernate(self, sid):
+        gs = self.resident.pop(sid, None)
+        self.last_used.pop(sid, None)
+        if gs is None:
+            return
+        save_game(gs, self._path(sid))
+        HIBERNATED.inc()
+
+    def sweep(self):
+        """Hibernate every session idle for longer than `idle_seconds`."""
+        # LRU order is also last-use order, so stop at the first fresh session
+        cutoff = self.clock() - self.idle_seconds
+        while self.resident:
+            sid = next(iter(self.resident))
+            if self.last_used[sid] >= cutoff:
+                break
+            self.hibernate(sid)
+
+    def close(self, sid):
+        """Forget `sid` entirely, in memory and on disk."""
+        self.resident.pop(sid, None)
+        self.last_used.pop(sid, None)
+        try:
+            os.remove(self._path(sid))
+        except FileNotFoundError:
+            pass
+
+    def hibernate_all(self):
+        """Write every resident session to disk (e.g. on shutdown)."""
+        for sid in list(self.resident):
+            self.hibernate(sid)
+
+    def _admit(self, sid, gs):
+        self.resident[sid] = gs
+        self.resident.move_to_end(sid)
+        self.last_used[sid] = self.clock()
+        while len(self.resident) > self.max_resident:
+            self.hibernate(next(iter(self.resident)))
+        self.sweep()
+
+    def _path(self, sid):
+        name = sid if _SAFE_ID.fullmatch(sid) else hashlib.sha1(sid.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
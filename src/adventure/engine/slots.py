@@ -0,0 +1,186 @@
+"""
+Named save slots with a compact index.
+
+Each slot is an ordinary `save_game` file, `<directory>/<slot>.json`. Next to
+the slot files sits `index.jsonl`, an append-only log with one short line
+per save or delete:
+
+    {"slot": "castle", "seed": 7, "theme": "horror", "n_rooms": 15,
+     "score": 21, "turns": 80, "time": 1760000000.0, "bytes": 5120}
+    {"slot": "castle", "deleted": true}
+
+Listing and pruning read only this log, never the saves themselves. The log
+is folded into a dict when opened and rewritten compactly (tmp file +
+os.replace) once it holds about twice as many lines as live slots, so
+re-saving one slot over and over keeps it small. Several processes may
+share a directory (every `play` uses ./saves): appends and rewrites hold
+`index.lock`, and a rewrite folds in the log on disk first, so it never
+drops slots another process saved.
+"""
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per saves directory
+    fcntl = None
+
+from adventure.engine.save import save_game, read_save
+
+_SLOT = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+INDEX = "index.jsonl"
+LOCK = "index.lock"
+DEFAULT_DIR = os.environ.get("INFOPROX_SAVES", "saves")
+
+
+class SlotManager:
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self.entries = {}  # slot -> index record, in save order
+        self._lines = 0    # lines in the log, live or not
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._read_index()
+
+    def __contains__(self, slot):
+        return slot in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def path(self, slot):
+        if not _SLOT.fullmatch(slot or ""):
+            raise ValueError(f"bad slot name {slot!r} (letters, digits, '_', '-', '.')")
+        return os.path.join(self.directory, f"{slot}.json")
+
+    def save(self, gs, slot) -> str:
+        """Write `gs` to `slot` and index it."""
+        path = self.path(slot)
+        save_game(gs, path)
+        self.record(slot, {
+            "seed": gs.world.seed,
+            "theme": gs.world.theme,
+            "n_rooms": len(gs.world.rooms),
+            "score": gs.score,
+            "turns": gs.turns,
+            "time": time.time(),
+            "bytes": os.path.getsize(path),
+        })
+        return f"Game saved to slot {slot}."
+
+    def record(self, slot, info):
+        """Index `slot` (already written) with `info`, replacing any older entry."""
+        entry = {"slot": slot, **info}
+        with self._lock:
+            self.entries.pop(slot, None)
+            self.entries[slot] = entry
+            self._append(entry)
+
+    def read(self, slot):
+        """The save data of `slot`, for `restore_game`."""
+        if slot not in self.entries:
+            raise KeyError(slot)
+        return read_save(self.path(slot))
+
+    def list(self, newest_first=True):
+        """Index records, newest first (or oldest first)."""
+        entries = sorted(self.entries.values(), key=lambda e: e["time"])
+        return entries[::-1] if newest_first else entries
+
+    def delete(self, slot):
+        with self._lock:
+            if self.entries.pop(slot, None) is None:
+                raise KeyError(slot)
+            self._append({"slot": slot, "deleted": True})
+        try:
+            os.remove(self.path(slot))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, keep=None, older_than=None, now=None):
+        """
+        Delete slots beyond the newest `keep` and/or saved more than
+        `older_than` seconds ago. Returns the deleted slot names.
+        """
+        now = time.time() if now is None else now
+        doomed = []
+        for i, e in enumerate(self.list()):
+            if (keep is not None and i >= keep) or (older_than is not None and now - e["time"] > older_than):
+                doomed.append(e["slot"])
+        for slot in doomed:
+            self.delete(slot)
+        return doomed
+
+    def compact(self):
+        """Rewrite the log with one line per live slot."""
+        with self._lock:
+            self._rewrite()
+
+    def _read_index(self):
+        if self._fold():
+            self._rewrite()  # so the next append starts on a fresh line
+
+    def _fold(self) -> bool:
+        """Replace `entries` with the log on disk, folded; True if it had torn lines."""
+        try:
+            with open(os.path.join(self.directory, INDEX)) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        entries, torn = {}, False
+        for line in lines:
+            try:
+                e = json.loads(line)
+            except ValueError:
+                e = None
+            if not isinstance(e, dict) or not isinstance(e.get("slot"), str):
+                torn = True  # half-written line after a crash, or one that isn't ours
+                continue
+            entries.pop(e["slot"], None)
+            if not e.get("deleted"):
+                entries[e["slot"]] = e
+        self.entries, self._lines = entries, len(lines)
+        return torn
+
+    def _append(self, entry):
+        with _locked(self.directory):
+            with open(os.path.join(self.directory, INDEX), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        self._lines += 1
+        if self._lines > 2 * len(self.entries) + 16:
+            self._rewrite()
+
+    def _rewrite(self):
+        # other processes may share the directory: fold in what they appended first
+        index = os.path.join(self.directory, INDEX)
+        tmp = f"{index}.tmp"
+        with _locked(self.directory):
+            self._fold()
+            with open(tmp, "w") as f:
+                for e in self.entries.values():
+                    f.write(json.dumps(e) + "\n")
+            os.replace(tmp, index)
+        self._lines = len(self.entries)
+
+
+@contextlib.contextmanager
+def _locked(directory):
+    """Hold `directory`'s index lock, shared with other processes (where the OS has flock)."""
+    with open(os.path.join(directory, LOCK), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+_open = {}
+
+def slots(directory=DEFAULT_DIR) -> SlotManager:
+    """Shared SlotManager for `directory` (the index is read once per process)."""
+    mgr = _open.get(directory)
+    if mgr is None:
+        mgr = _open[directory] = SlotManager(directory)
+    return mgr
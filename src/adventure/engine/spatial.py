@@ -0,0 +1,105 @@
+"""
+Sparse spatial index over revealed map cells.
+
+`MapCoords` is the `gs.map_coords` dict (room id -> (x, y, z)) that also
+files every room into fixed-size square chunks: (z, x // CHUNK, y // CHUNK).
+A viewport query then touches only the chunks overlapping the window, so
+drawing the map costs the same whether 20 or 200,000 rooms have been seen.
+"""
+CHUNK = 16
+
+
+class MapCoords(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.chunks = {}  # (z, cx, cy) -> {(x, y): rid}
+        self.levels = {}  # z -> rooms revealed on that level
+        self.update(*args, **kwargs)
+
+    # ---------- dict protocol, keeping the index in step ----------
+
+    def __setitem__(self, rid, pos):
+        old = self.get(rid)
+        if old == pos:
+            return
+        if old is not None:
+            self._unfile(rid, old)
+        super().__setitem__(rid, pos)
+        self._file(rid, pos)
+
+    def __delitem__(self, rid):
+        self._unfile(rid, self[rid])
+        super().__delitem__(rid)
+
+    def pop(self, rid, *default):
+        if rid not in self:
+            return super().pop(rid, *default)
+        pos = self[rid]
+        del self[rid]
+        return pos
+
+    def setdefault(self, rid, pos=None):
+        if rid not in self:
+            self[rid] = pos
+        return self[rid]
+
+    def update(self, *args, **kwargs):
+        for rid, pos in dict(*args, **kwargs).items():
+            self[rid] = pos
+
+    def clear(self):
+        super().clear()
+        self.chunks.clear()
+        self.levels.clear()
+
+    def popitem(self):
+        rid, pos = super().popitem()
+        self._unfile(rid, pos)
+        return rid, pos
+
+    def copy(self):
+        return MapCoords(self)
+
+    def __reduce__(self):
+        # rebuild through __init__ so copy/deepcopy/pickle refile every room once
+        return MapCoords, (dict(self),)
+
+    # ---------- queries ----------
+
+    def at(self, x, y, z):
+        """Room id revealed at (x, y, z), or None."""
+        chunk = self.chunks.get((z, x // CHUNK, y // CHUNK))
+        return chunk.get((x, y)) if chunk else None
+
+    def window(self, z, x0, x1, y0, y1):
+        """{(x, y): rid} for revealed cells on level z with x0 <= x <= x1, y0 <= y <= y1."""
+        out = {}
+        chunks = self.chunks
+        for cx in range(x0 // CHUNK, x1 // CHUNK + 1):
+            for cy in range(y0 // CHUNK, y1 // CHUNK + 1):
+                chunk = chunks.get((z, cx, cy))
+                if not chunk:
+                    continue
+                for (x, y), rid in chunk.items():
+                    if x0 <= x <= x1 and y0 <= y <= y1:
+                        out[(x, y)] = rid
+        return out
+
+    # ---------- internals ----------
+
+    def _file(self, rid, pos):
+        x, y, z = pos
+        self.chunks.setdefault((z, x // CHUNK, y // CHUNK), {})[(x, y)] = rid
+        self.levels[z] = self.levels.get(z, 0) + 1
+
+    def _unfile(self, rid, pos):
+        x, y, z = pos
+        key = (z, x // CHUNK, y // CHUNK)
+        chunk = self.chunks[key]
+        if chunk.get((x, y)) == rid:
+            del chunk[(x, y)]
+            if not chunk:
+                del self.chunks[key]
+        self.levels[z] -= 1
+        if not self.levels[z]:
+            del self.levels[z]
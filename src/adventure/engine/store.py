@@ -0,0 +1,267 @@
+"""
+SQLite-backed room storage for worlds larger than memory.
+
+`SQLiteRooms` is a mutable mapping that stands in for `World.rooms`. Rooms,
+exits and items live in a local SQLite file. Only a bounded LRU cache of
+`Room` objects stays in memory, and evicted rooms are written back when
+they changed. A room that is still referenced elsewhere (`gs.room`) is
+handed back as the same object rather than a second copy, and it can keep
+changing after eviction: when it is finally garbage collected its state is
+queued and written back before the room is next read. Generation
+writes all rooms with batched inserts (`adopt`).
+
+    store = SQLiteRooms("world.db")
+    world = make_world(seed=1, store=store)   # or: world = open_world("world.db")
+    ...
+    store.flush()
+"""
+import json
+import sqlite3
+import weakref
+from types import SimpleNamespace
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+
+from adventure.engine import metrics
+from adventure.engine.world import World, Room, Item, Exit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS rooms (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, tags TEXT NOT NULL, seen INTEGER NOT NULL,
+    base_desc TEXT NOT NULL, x INTEGER, y INTEGER, z INTEGER
+);
+CREATE TABLE IF NOT EXISTS exits (
+    room_id TEXT NOT NULL, ord INTEGER NOT NULL, dir TEXT NOT NULL, to_id TEXT NOT NULL,
+    locked INTEGER NOT NULL, key_tag TEXT, description TEXT NOT NULL,
+    PRIMARY KEY (room_id, ord)
+);
+CREATE TABLE IF NOT EXISTS items (
+    room_id TEXT NOT NULL, ord INTEGER NOT NULL, name TEXT NOT NULL, tags TEXT NOT NULL,
+    portable INTEGER NOT NULL, description TEXT NOT NULL,
+    PRIMARY KEY (room_id, ord)
+);
+"""
+
+_BATCH = 10_000
+
+
+class SQLiteRooms(MutableMapping):
+    def __init__(self, path=":memory:", cache_size=4096):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+        self.cache_size = max(1, int(cache_size))
+        self.cache = OrderedDict()                 # rid -> Room, least recently used first
+        self.live = weakref.WeakValueDictionary()  # rid -> Room handed out and maybe still in use
+        self._orphans = []                         # __dict__s of handed-out rooms since collected
+        self.layout = _Layout(self)
+        self._count = self.db.execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+
+    # ---------- mapping protocol ----------
+
+    def __getitem__(self, rid):
+        if self._orphans:
+            self._adopt_orphans()
+        room = self.cache.get(rid)
+        if room is not None:
+            metrics.CACHE_HITS.inc(label="rooms")
+            self.cache.move_to_end(rid)
+            return room
+        room = self.live.get(rid)
+        if room is None:
+            metrics.CACHE_MISSES.inc(label="rooms")
+            room = self._read(rid)
+        self._cache(room)
+        return room
+
+    def __setitem__(self, rid, room):
+        if self._orphans:
+            self._adopt_orphans()
+        self._write(room, insert=rid not in self)
+        self._cache(room)
+
+    def __delitem__(self, rid):
+        if rid not in self:
+            raise KeyError(rid)
+        if self._orphans:
+            self._adopt_orphans()
+        self.cache.pop(rid, None)
+        self.live.pop(rid, None)
+        for table, col in (("rooms", "id"), ("exits", "room_id"), ("items", "room_id")):
+            self.db.execute(f"DELETE FROM {table} WHERE {col} = ?", (rid,))
+        self._count -= 1
+
+    def __contains__(self, rid):
+        if rid in self.cache:
+            return True
+        return self.db.execute("SELECT 1 FROM rooms WHERE id = ?", (rid,)).fetchone() is not None
+
+    def __iter__(self):
+        # chunked by rowid (insertion order) so write-backs during iteration are safe
+        last = 0
+        while True:
+            rows = self.db.execute(
+                "SELECT rowid, id FROM rooms WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, _BATCH)
+            ).fetchall()
+            if not rows:
+                return
+            for last, rid in rows:
+                yield rid
+
+    def __len__(self):
+        return self._count
+
+    # ---------- bulk & lifecycle ----------
+
+    def adopt(self, world: World):
+        """Move a freshly generated world's rooms into the store (batched inserts)."""
+        layout = world.layout or {}
+        rooms, exits, items = [], [], []
+        for room in world.rooms.values():
+            x, y, z = layout.get(room.id, (None, None, None))
+            rooms.append(_room_row(room) + (x, y, z))
+            exits.extend(_exit_rows(room))
+            items.extend(_item_rows(room))
+            if len(rooms) >= _BATCH:
+                self._insert(rooms, exits, items)
+                rooms, exits, items = [], [], []
+        self._insert(rooms, exits, items)
+        self.set_meta(start=world.start, seed=world.seed, theme=world.theme)
+        self.db.commit()
+        world.rooms = self
+        world.layout = self.layout
+        return world
+
+    def set_meta(self, **values):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(k, json.dumps(v)) for k, v in values.items()],
+        )
+
+    def meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def flush(self):
+        """Write back every changed room still in memory and commit."""
+        self._adopt_orphans()
+        seen = set()
+        for room in list(self.cache.values()) + list(self.live.values()):
+            if room.id not in seen:
+                seen.add(room.id)
+                self._write_back(room)
+        self.db.commit()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    # ---------- internals ----------
+
+    def _cache(self, room):
+        self.cache[room.id] = room
+        self.cache.move_to_end(room.id)
+        if self.live.get(room.id) is not room:
+            self.live[room.id] = room
+            # the room may change after it leaves the cache; its __dict__ outlives it, so
+            # queue that for write-back (SQL can't run safely inside a GC callback)
+            weakref.finalize(room, self._orphans.append, room.__dict__).atexit = False
+        while len(self.cache) > self.cache_size:
+            _, old = self.cache.popitem(last=False)
+            self._write_back(old)
+
+    def _adopt_orphans(self):
+        while self._orphans:
+            self._write_back(SimpleNamespace(**self._orphans.pop(0)))
+
+    def _insert(self, rooms, exits, items):
+        self.db.executemany("INSERT INTO rooms VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rooms)
+        self.db.executemany("INSERT INTO exits VALUES (?, ?, ?, ?, ?, ?, ?)", exits)
+        self.db.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)", items)
+        self._count += len(rooms)
+
+    def _read(self, rid):
+        row = self.db.execute(
+            "SELECT id, name, tags, seen, base_desc FROM rooms WHERE id = ?", (rid,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(rid)
+        room = Room(id=row[0], name=row[1], tags=json.loads(row[2]), seen=bool(row[3]), base_desc=row[4])
+        exit_rows = self.db.execute("SELECT * FROM exits WHERE room_id = ? ORDER BY ord", (rid,)).fetchall()
+        for _, _, d, to, locked, key_tag, desc in exit_rows:
+            room.exits[d] = Exit(to=to, locked=bool(locked), key_tag=key_tag, description=desc)
+        item_rows = self.db.execute("SELECT * FROM items WHERE room_id = ? ORDER BY ord", (rid,)).fetchall()
+        for _, _, name, tags, portable, desc in item_rows:
+            room.items.append(Item(name=name, tags=json.loads(tags), portable=bool(portable), description=desc))
+        # the rows just read are exactly what _state() would produce for an unchanged room
+        room._stored = (row, exit_rows, item_rows)
+        return room
+
+    def _write(self, room, insert=False):
+        if insert:
+            self._insert([_room_row(room) + (None, None, None)], list(_exit_rows(room)), list(_item_rows(room)))
+        else:
+            self.db.execute(
+                "UPDATE rooms SET name = ?, tags = ?, seen = ?, base_desc = ? WHERE id = ?",
+                _room_row(room)[1:] + (room.id,),
+            )
+            self.db.execute("DELETE FROM exits WHERE room_id = ?", (room.id,))
+            self.db.execute("DELETE FROM items WHERE room_id = ?", (room.id,))
+            self.db.executemany("INSERT INTO exits VALUES (?, ?, ?, ?, ?, ?, ?)", _exit_rows(room))
+            self.db.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)", _item_rows(room))
+        room._stored = _state(room)
+
+    def _write_back(self, room):
+        if getattr(room, "_stored", None) != _state(room):
+            self._write(room)
+
+
+class _Layout(Mapping):
+    """World.layout view over the rooms table's x/y/z columns."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, rid):
+        row = self.store.db.execute("SELECT x, y, z FROM rooms WHERE id = ?", (rid,)).fetchone()
+        if row is None or row[0] is None:
+            raise KeyError(rid)
+        return tuple(row)
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def __len__(self):
+        return len(self.store)
+
+
+def open_world(path, cache_size=4096) -> World:
+    """Reopen a world previously stored with `make_world(..., store=SQLiteRooms(path))`."""
+    store = SQLiteRooms(path, cache_size=cache_size)
+    return World(
+        rooms=store,
+        start=store.meta("start"),
+        seed=store.meta("seed"),
+        theme=store.meta("theme", "fantasy"),
+        layout=store.layout,
+    )
+
+
+def _room_row(room):
+    return (room.id, room.name, json.dumps(room.tags), int(room.seen), room.base_desc)
+
+def _exit_rows(room):
+    return [
+        (room.id, i, d, ex.to, int(ex.locked), ex.key_tag, ex.description)
+        for i, (d, ex) in enumerate(room.exits.items())
+    ]
+
+def _item_rows(room):
+    return [
+        (room.id, i, it.name, json.dumps(it.tags), int(it.portable), it.description)
+        for i, it in enumerate(room.items)
+    ]
+
+def _state(room):
+    """Everything a write-back would store, for cheap dirty checks."""
+    return (_room_row(room), _exit_rows(room), _item_rows(room))
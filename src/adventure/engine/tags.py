@@ -0,0 +1,92 @@
+"""
+Interned tag vocabulary.
+
+Every distinct tag string gets a small integer id, and rooms/items carry a
+bitset (`mask`) of their tag ids next to the `tags` list. Tags belong to a
+namespace ("key:rune1" -> key, "arch:vault" -> arch, bare "note"/"paper"/
+"book" -> note), and each namespace keeps a mask of its ids, so "does this
+item have any key:* tag" is one AND instead of a `startswith` scan.
+"""
+import threading
+
+NAMESPACES = ("arch", "theme", "key", "artifact", "goal", "note")
+_BARE = {"note": "note", "paper": "note", "book": "note"}
+
+
+class TagVocab:
+    def __init__(self):
+        self.ids = {}        # tag -> id
+        self.names = []      # id -> tag (the canonical, shared string)
+        self.spaces = []     # id -> namespace or None
+        self.values = []     # id -> part after "ns:" (or the bare tag)
+        self.ns_masks = {ns: 0 for ns in NAMESPACES}
+        self._lock = threading.Lock()
+
+    def intern(self, tag: str) -> int:
+        tid = self.ids.get(tag)
+        if tid is not None:
+            return tid
+        with self._lock:
+            tid = self.ids.get(tag)
+            if tid is None:
+                tid = len(self.names)
+                prefix, sep, rest = tag.partition(":")
+                ns = prefix if sep and prefix in self.ns_masks else _BARE.get(tag)
+                self.names.append(tag)
+                self.spaces.append(ns)
+                self.values.append(rest if sep else tag)
+                if ns:
+                    self.ns_masks[ns] |= 1 << tid
+                self.ids[tag] = tid
+        return tid
+
+    def canonical(self, tags):
+        """(shared tag strings, mask) for a list of tags."""
+        names = self.names
+        out, mask = [], 0
+        for t in tags:
+            tid = self.intern(t)
+            out.append(names[tid])
+            mask |= 1 << tid
+        return out, mask
+
+    def namespace(self, tag):
+        if not tag:
+            return None
+        return self.spaces[self.intern(tag)]
+
+    def ns_mask(self, ns) -> int:
+        return self.ns_masks[ns]
+
+    def has(self, mask, ns) -> bool:
+        return bool(mask & self.ns_masks[ns])
+
+    def tags_of(self, mask, ns):
+        """Tags of `mask` in namespace `ns`, in id order."""
+        m = mask & self.ns_masks[ns]
+        out = []
+        while m:
+            low = m & -m
+            out.append(self.names[low.bit_length() - 1])
+            m ^= low
+        return out
+
+    def value(self, mask, ns, tags=()):
+        """
+        Value of the `ns:` tag in `mask` ("arch:vault" -> "vault"), or None.
+        Ids follow interning order, so when `mask` has several `ns:` tags the
+        first of them in `tags` (the list `mask` was built from) wins.
+        """
+        m = mask & self.ns_masks[ns]
+        if not m:
+            return None
+        if not m & (m - 1):  # the usual case: exactly one
+            return self.values[m.bit_length() - 1]
+        for t in tags:
+            tid = self.intern(t)
+            if self.spaces[tid] == ns:
+                return self.values[tid]
+        return self.values[(m & -m).bit_length() - 1]
+
+
+VOCAB = TagVocab()
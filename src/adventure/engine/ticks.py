@@ -0,0 +1,220 @@
+"""
+Timed world events, advanced once per turn.
+
+A `Ticker` keeps every scheduled event in one heap ordered by the turn it
+is due, so a turn only pops what is due now, however many events or rooms
+the world has. Three kinds exist:
+
+- relock: an unlocked door shuts and locks again some turns later, but only
+  while the player holds its key (so the world can never become unsolvable)
+- wander: notes drift to a neighbouring room through open exits
+- ambient: a theme line, heard when the player is in that part of the world
+
+Rooms are grouped into regions of REGION x REGION layout cells per level.
+Only regions next to the player's are active. An event that comes due in
+an inactive region is parked with that region instead of being run or
+rescheduled, so far-off parts of the world cost nothing per turn. When the
+player comes near again the region wakes and each parked event is fast-
+forwarded in one step: a door relocks once, a note makes at most
+FORWARD_HOPS hops, ambient lines nobody heard are dropped.
+
+World changes made by events go into the undo journal like any other; the
+schedule itself is not rewound by `undo`.
+
+    gs.ticks = Ticker(gs.world, start=gs.turns)
+    messages = gs.ticks.advance(gs)   # once per turn (`step` does this)
+"""
+import heapq
+import itertools
+import random
+
+from adventure.engine import metrics
+from adventure.engine.actions import _journal
+from adventure.engine.gen import ensure_layout
+from adventure.engine.progress import GOAL_TAG
+from adventure.engine.tags import VOCAB
+
+REGION = 4         # layout cells per region side
+RELOCK_TURNS = 25
+WANDER_TURNS = 12
+AMBIENT_TURNS = 9
+FORWARD_HOPS = 8   # wander hops replayed at most when a region wakes
+
+AMBIENT = {
+    "fantasy": ["A draught carries the smell of old candle smoke.",
+                "Somewhere, stone grinds against stone.",
+                "Far off, a bell tolls once."],
+    "scifi":   ["Ventilation fans spin up, then die away.",
+                "A status light blinks amber, then green.",
+                "The deck hums with a distant pump."],
+    "horror":  ["Something skitters behind the walls.",
+                "A child's laugh, cut short.",
+                "The air turns cold for a moment."],
+}
+
+TICK_EVENTS = metrics.REGISTRY.counter(
+    "infoprox_tick_events_total", "Timed world events run, by kind.", label="kind")
+
+
+class Event:
+    __slots__ = ("kind", "due", "period", "region", "data")
+
+    def __init__(self, kind, due, period, region, data):
+        self.kind = kind
+        self.due = due
+        self.period = period  # 0 = one-shot
+        self.region = region
+        self.data = data
+
+
+class Ticker:
+    def __init__(self, world, start=0):
+        self.world = world
+        self.heap = []     # (due, seq, Event)
+        self.parked = {}   # region -> [Event] due while the region was inactive
+        self.active = set()
+        self.centre = None
+        self.rng = random.Random(f"{world.seed}:ticks")
+        self._seq = itertools.count()
+        layout = ensure_layout(world)
+        self.region_of = {rid: region_of(pos) for rid, pos in layout.items()}
+        note = VOCAB.ns_mask("note")
+        for rid, room in world.rooms.items():
+            for it in room.items:
+                if it.portable and it.mask & note:
+                    self.schedule("wander", start + self._jitter(WANDER_TURNS), WANDER_TURNS, rid, [it, rid])
+        for region in sorted(set(self.region_of.values())):
+            self._push(Event("ambient", start + self._jitter(AMBIENT_TURNS), AMBIENT_TURNS, region, None))
+
+    def schedule(self, kind, due, period, rid, data):
+        self._push(Event(kind, due, period, self.region_of[rid], data))
+
+    def pending(self) -> int:
+        return len(self.heap) + sum(len(evs) for evs in self.parked.values())
+
+    # ---------- engine hooks ----------
+
+    def unlocked(self, rid, ex, now):
+        """Exit `ex` of room `rid` was opened on turn `now`."""
+        if ex.key_tag == GOAL_TAG:
+            return
+        d = next(d for d, e in self.world.rooms[rid].exits.items() if e is ex)
+        self.schedule("relock", now + RELOCK_TURNS, 0, rid, (rid, d))
+
+    def advance(self, gs):
+        """Run the events due by `gs.turns` near the player; returns messages for them."""
+        now = gs.turns
+        self._focus(gs, self.region_of[gs.room.id])
+        out = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            ev = heapq.heappop(heap)[2]
+            if ev.region not in self.active:
+                self.parked.setdefault(ev.region, []).append(ev)
+                continue
+            msg = self._fire(gs, ev)
+            if msg:
+                out.append(msg)
+            if ev.period and ev.data is not False:
+                ev.due += ev.period
+                self._push(ev)
+        return out
+
+    # ---------- regions ----------
+
+    def _focus(self, gs, centre):
+        if centre == self.centre:
+            return
+        self.centre = centre
+        z, cx, cy = centre
+        near = {(z + dz, cx + dx, cy + dy) for dz in (-1, 0, 1) for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+        woken = near - self.active
+        self.active = near
+        for region in sorted(woken & self.parked.keys()):
+            for ev in self.parked.pop(region):
+                self._fast_forward(gs, ev, gs.turns)
+
+    def _fast_forward(self, gs, ev, now):
+        """Catch a parked event up to `now` in one go, then put it back on the heap."""
+        missed = (now - ev.due) // ev.period + 1 if ev.period else 1
+        if ev.kind == "relock":
+            self._fire(gs, ev)
+        elif ev.kind == "wander":
+            for _ in range(min(missed, FORWARD_HOPS)):
+                self._fire(gs, ev, quiet=True)
+                if ev.data is False:
+                    break
+        if ev.period and ev.data is not False:
+            ev.due += missed * ev.period
+            self._push(ev)
+
+    # ---------- events ----------
+
+    def _fire(self, gs, ev, quiet=False):
+        TICK_EVENTS.inc(label=ev.kind)
+        if ev.kind == "relock":
+            return self._relock(gs, *ev.data)
+        if ev.kind == "wander":
+            return self._wander(gs, ev, quiet)
+        if ev.kind == "ambient" and self.region_of[gs.room.id] == ev.region:
+            return self.rng.choice(AMBIENT.get(self.world.theme, AMBIENT["fantasy"]))
+        return None
+
+    def _relock(self, gs, rid, d):
+        rooms = self.world.rooms
+        ex = rooms[rid].exits[d]
+        if ex.locked or not gs.inv.holds_key(ex.key_tag):
+            return None
+        back = next((d2 for d2, ex2 in rooms[ex.to].exits.items() if ex2.to == rid), None)
+        for r, side in ((rid, d), (ex.to, back)):
+            if side is None:
+                continue
+            door = rooms[r].exits[side]
+            if not door.locked:
+                _journal(gs, "unlock", door)
+                door.locked = True
+        gs.progress = None  # union-find can't split; rebuilt on next use
+        if gs.room.id == rid:
+            return f"The way {d} swings shut and locks."
+        if gs.room.id == ex.to and back:
+            return f"The way {back} swings shut and locks."
+        return None
+
+    def _wander(self, gs, ev, quiet):
+        item, rid = ev.data
+        rooms = self.world.rooms
+        src = rooms[rid]
+        if not any(it is item for it in src.items):
+            ev.data = False  # taken (or undone away); this note stops wandering
+            return None
+        ways = sorted(d for d, ex in src.exits.items() if not ex.locked)
+        if not ways:
+            return None
+        d = self.rng.choice(ways)
+        dst = rooms[src.exits[d].to]
+        index = next(i for i, it in enumerate(src.items) if it is item)
+        _journal(gs, "moved", src, index, dst, item)
+        del src.items[index]
+        dst.items.append(item)
+        ev.data = [item, dst.id]
+        ev.region = self.region_of[dst.id]
+        if quiet:
+            return None
+        if gs.room is src:
+            return f"The {item.name} drifts away {d}."
+        if gs.room is dst:
+            return f"A {item.name} drifts in."
+        return None
+
+    # ---------- internals ----------
+
+    def _push(self, ev):
+        heapq.heappush(self.heap, (ev.due, next(self._seq), ev))
+
+    def _jitter(self, period):
+        return self.rng.randint(1, period)
+
+
+def region_of(pos):
+    x, y, z = pos
+    return (z, x // REGION, y // REGION)
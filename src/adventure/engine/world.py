@@ -1,8 +1,20 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from adventure.engine.tags import VOCAB
 
 DIRECTIONS = ["north", "south", "east", "west", "up", "down"]
 
+# Grid deltas (x, y, z) per direction; north is -y so maps read top-down.
+DIR_DELTAS = {
+    "north": (0, -1, 0),
+    "south": (0,  1, 0),
+    "east":  (1,  0, 0),
+    "west":  (-1, 0, 0),
+    "up":    (0,  0, 1),
+    "down":  (0,  0,-1),
+}
+
 @dataclass
 class Item:
     name: str
@@ -10,6 +22,15 @@ class Item:
     portable: bool = True
     description: str = ""
 
+    def __post_init__(self):
+        # not a field: asdict()/saves only ever see `tags`
+        self.tags, self.mask = VOCAB.canonical(self.tags)
+
+    def add_tag(self, tag: str):
+        tid = VOCAB.intern(tag)
+        self.tags.append(VOCAB.names[tid])
+        self.mask |= 1 << tid
+
 @dataclass
 class Exit:
     to: str  # room id
@@ -27,12 +48,21 @@ class Room:
     seen: bool = False
     base_desc: str = ""
 
+    def __post_init__(self):
+        self.tags, self.mask = VOCAB.canonical(self.tags)
+
+    def add_tag(self, tag: str):
+        tid = VOCAB.intern(tag)
+        self.tags.append(VOCAB.names[tid])
+        self.mask |= 1 << tid
+
 @dataclass
 class World:
     rooms: Dict[str, Room]
     start: str
     seed: int
     theme: str  # "fantasy" | "scifi" | "horror"
+    layout: Dict[str, Tuple[int, int, int]] = field(default_factory=dict)  # room id -> (x, y, z)
 
 def short_room_text(room: Room) -> str:
     exits = ", ".join([d for d in room.exits.keys()]) or "nowhere"
@@ -0,0 +1,169 @@
+"""
+Generator fuzzing: build many worlds on all cores and check each one.
+
+Every (seed, theme, size) in the requested ranges is generated with
+`make_world` and checked against the structural invariants below. Work is
+handed to a process pool in chunks of seeds; each worker generates and
+checks its worlds itself, so nothing but failures crosses processes.
+
+A failing case is shrunk before it is reported: first to the smallest size
+that still fails the same invariant with that seed, then to the smallest
+seed (below `shrink_limit`) that fails it at that size. One shrunk case is
+kept per (invariant, theme).
+
+    infoprox fuzz --seeds 0:1000000 --sizes 8-15 --workers 8
+"""
+import os
+import time
+from multiprocessing import Pool
+
+from adventure.engine.campaign import check_world
+from adventure.engine.gen import THEMES, make_world
+from adventure.engine.progress import GOAL_TAG
+from adventure.engine.tags import VOCAB
+from adventure.engine.world import DIRECTIONS
+
+SIZES = range(8, 16)  # make_world clamps n_rooms to this range
+
+
+# ---------- invariants ----------
+
+def check(world):
+    """(invariant, detail) for the first invariant `world` breaks, or None."""
+    rooms = world.rooms
+    for rid, room in rooms.items():
+        for d, ex in room.exits.items():
+            if d not in DIRECTIONS:
+                return "direction", f"{rid} has an exit {d!r}"
+            if ex.to not in rooms or ex.to == rid:
+                return "target", f"{rid} {d} leads to {ex.to!r}"
+            back = [e for e in rooms[ex.to].exits.values() if e.to == rid]
+            if len(back) != 1:
+                return "reverse", f"{rid} {d} -> {ex.to} has {len(back)} ways back"
+            if back[0].locked != ex.locked or back[0].key_tag != ex.key_tag:
+                return "twin", f"{rid} {d} -> {ex.to}: locked/key {ex.locked}/{ex.key_tag} " \
+                               f"vs {back[0].locked}/{back[0].key_tag}"
+            if ex.locked and not ex.key_tag:
+                return "twin", f"{rid} {d} is locked with no key"
+
+    # every room joined to the start once all locks are open
+    seen = {world.start}
+    todo = [world.start]
+    while todo:
+        for ex in rooms[todo.pop()].exits.values():
+            if ex.to not in seen:
+                seen.add(ex.to)
+                todo.append(ex.to)
+    if len(seen) != len(rooms):
+        return "connected", f"{len(rooms) - len(seen)} room(s) cut off from the start"
+    start = rooms[world.start]
+    at_feet = {t for it in start.items for t in VOCAB.tags_of(it.mask, "key")}
+    if not any(not ex.locked or ex.key_tag in at_feet for ex in start.exits.values()):
+        return "start", f"start {world.start} is walled in"
+
+    fixture = 1 << VOCAB.intern("fixture")
+    vaults = [(rid, it) for rid, r in rooms.items() for it in r.items if it.mask & fixture]
+    if len(vaults) != 1:
+        return "vault", f"{len(vaults)} vault fixtures"
+    vault = rooms[vaults[0][0]]
+    if not vault.exits or any(ex.key_tag != GOAL_TAG for ex in vault.exits.values()):
+        return "vault", f"vault {vault.id} has an exit that is not the goal gate"
+
+    layout = world.layout
+    if len(set(layout.values())) != len(rooms):
+        return "layout", "two rooms share a map cell"
+    if not check_world(world):
+        return "solvable", "the vault cannot be opened from the start"
+    return None
+
+
+def check_case(seed, theme, size):
+    return check(make_world(seed=seed, n_rooms=size, theme=theme))
+
+
+# ---------- search ----------
+
+def _chunk(args):
+    """Worker: check seeds lo..hi-1 for every theme and size; returns (worlds, failures)."""
+    lo, hi, themes, sizes = args
+    failures = []
+    for seed in range(lo, hi):
+        for theme in themes:
+            for size in sizes:
+                bad = check_case(seed, theme, size)
+                if bad:
+                    failures.append((bad[0], seed, theme, size, bad[1]))
+    return (hi - lo) * len(themes) * len(sizes), failures
+
+
+def shrink(invariant, seed, theme, size, shrink_limit=10_000):
+    """Smallest (seed, size) failing `invariant` for `theme`: size first, then seed."""
+    for smaller in SIZES:
+        if smaller >= size:
+            break
+        bad = check_case(seed, theme, smaller)
+        if bad and bad[0] == invariant:
+            size = smaller
+            break
+    for lower in range(min(seed, shrink_limit)):
+        bad = check_case(lower, theme, size)
+        if bad and bad[0] == invariant:
+            return lower, size, bad[1]
+    return seed, size, check_case(seed, theme, size)[1]
+
+
+def run(seeds, themes=None, sizes=SIZES, workers=None, chunk=200, shrink_limit=10_000, report=None):
+    """
+    Fuzz every seed in `seeds` (a range) x `themes` x `sizes`. Returns
+    (worlds checked, {(invariant, theme): (seed, size, detail)}) with each
+    failure shrunk. `report(done, total, seconds)` is called as chunks finish.
+    """
+    themes = sorted(themes or THEMES)
+    unknown = set(themes) - set(THEMES)
+    if unknown:
+        raise ValueError(f"unknown theme(s): {', '.join(sorted(unknown))}")
+    sizes = sorted(set(max(SIZES[0], min(SIZES[-1], s)) for s in sizes))
+    jobs = [(lo, min(lo + chunk, seeds.stop), themes, sizes) for lo in range(seeds.start, seeds.stop, chunk)]
+    total = len(seeds) * len(themes) * len(sizes)
+    first = {}
+    done = 0
+    t0 = time.perf_counter()
+    with Pool(workers or os.cpu_count()) as pool:
+        for n, failures in pool.imap_unordered(_chunk, jobs):
+            done += n
+            for inv, seed, theme, size, detail in failures:
+                key = (inv, theme)
+                if key not in first or (size, seed) < first[key][:2]:
+                    first[key] = (size, seed, detail)
+            if report:
+                report(done, total, time.perf_counter() - t0)
+    found = {}
+    for (inv, theme), (size, seed, _) in sorted(first.items()):
+        found[(inv, theme)] = shrink(inv, seed, theme, size, shrink_limit)
+    return done, found
+
+
+def main(seeds, themes=None, sizes=SIZES, workers=None, chunk=200, shrink_limit=10_000):
+    """Run the fuzzer with a progress line; returns the number of distinct failures."""
+    def report(done, total, seconds):
+        rate = done / seconds * 3600 if seconds else 0.0
+        print(f"\r{done}/{total} worlds, {rate / 1e6:.2f}M/hour", end="", flush=True)
+
+    done, found = run(seeds, themes=themes, sizes=sizes, workers=workers, chunk=chunk,
+                      shrink_limit=shrink_limit, report=report)
+    print()
+    for (inv, theme), (seed, size, detail) in found.items():
+        print(f"FAIL {inv:<10} seed={seed} rooms={size} theme={theme}: {detail}")
+    print(f"{done} worlds checked, {len(found)} distinct failure(s).")
+    return len(found)
+
+
+def parse_range(text):
+    """'A:B' (B exclusive) or 'A-B' (inclusive) or 'N' -> range."""
+    if ":" in text:
+        a, b = text.split(":", 1)
+        return range(int(a), int(b))
+    if "-" in text.strip("-"):
+        a, b = text.split("-", 1)
+        return range(int(a), int(b) + 1)
+    return range(int(text), int(text) + 1)
@@ -0,0 +1,199 @@
+"""
+Synthetic player load: N bot sessions played round-robin against one engine.
+
+Bots issue plain command strings, so every turn goes through `parse` and the
+`do_*` actions exactly like a human's. Only `step` is timed; bot planning is
+not.
+"""
+import math
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from adventure.engine.loop import new_game, step
+from adventure.engine.progress import GOAL_TAG, progress_of
+
+
+# ---------- bots ----------
+
+class RandomWalker:
+    """Wanders through open exits, picking things up and looking around."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def next_command(self, gs):
+        room = gs.room
+        roll = self.rng.random()
+        takeable = [it for it in room.items if it.portable]
+        if takeable and roll < 0.3:
+            return f"take {self.rng.choice(takeable).name}"
+        if roll < 0.4:
+            return self.rng.choice(["look", "inventory", "l", "i"])
+        open_dirs = [d for d, ex in room.exits.items() if not ex.locked]
+        if open_dirs:
+            return f"go {self.rng.choice(open_dirs)}"
+        return "look"
+
+
+class GreedySolver:
+    """Heads for the nearest useful room: loot to take or a lock it can open."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.walker = RandomWalker(rng)
+
+    def next_command(self, gs):
+        room = gs.room
+        for it in room.items:
+            if it.portable:
+                return f"take {it.name}"
+        p = progress_of(gs)
+        openable = p.openable(gs)
+        for rid, d in openable:
+            if rid == room.id:
+                # a bare `use` opens the vault gate; key locks are picked by direction
+                return "use" if room.exits[d].key_tag == GOAL_TAG else f"unlock {d}"
+        path = self._path_to(gs, set(p.loot_rooms(gs)) | {rid for rid, _ in openable})
+        if path:
+            return f"go {path[0]}"
+        return self.walker.next_command(gs)
+
+    def _path_to(self, gs, targets):
+        """Directions to the nearest room in `targets` (BFS over open exits)."""
+        rooms = gs.world.rooms
+        prev = {gs.room.id: None}
+        q = deque([gs.room.id])
+        while q:
+            rid = q.popleft()
+            if rid in targets and rid != gs.room.id:
+                path = []
+                while prev[rid] is not None:
+                    rid, d = prev[rid]
+                    path.append(d)
+                return path[::-1]
+            for d, ex in rooms[rid].exits.items():
+                if not ex.locked and ex.to not in prev:
+                    prev[ex.to] = (rid, d)
+                    q.append(ex.to)
+        return []
+
+
+class MapSpammer:
+    """Mostly redraws the map, moving now and then so there is something to draw."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.walker = RandomWalker(rng)
+
+    def next_command(self, gs):
+        roll = self.rng.random()
+        if roll < 0.4:
+            return "map"
+        if roll < 0.6:
+            return "map all"
+        return self.walker.next_command(gs)
+
+
+BOTS = {"walker": RandomWalker, "solver": GreedySolver, "spammer": MapSpammer}
+DEFAULT_MIX = {"walker": 2, "solver": 1, "spammer": 1}
+
+
+# ---------- driver ----------
+
+def percentile(sorted_vals, p):
+    """Nearest-rank percentile of an already-sorted list."""
+    if not sorted_vals:
+        return 0.0
+    k = math.ceil(p / 100 * len(sorted_vals)) - 1
+    return sorted_vals[max(0, min(len(sorted_vals) - 1, k))]
+
+def _spawn(n_sessions, seed, rooms, theme, mix):
+    rng = random.Random(seed)
+    kinds = [k for k, w in mix.items() for _ in range(w)]
+    if not kinds:
+        raise ValueError("the bot mix has no weight above 0")
+    sessions = []
+    for i in range(n_sessions):
+        gs = new_game(seed=seed + i, theme=theme or rng.choice(["fantasy", "scifi", "horror"]), rooms=rooms)
+        bot = BOTS[kinds[i % len(kinds)]](random.Random(seed * 7919 + i))
+        sessions.append((gs, bot))
+    return sessions
+
+def _play(sessions, turns, latencies=None):
+    clock = time.perf_counter
+    for _ in range(turns):
+        for gs, bot in sessions:
+            cmd = bot.next_command(gs)
+            t0 = clock()
+            step(gs, cmd)
+            if latencies is not None:
+                latencies.append(clock() - t0)
+
+def run(n_sessions, turns=200, seed=0, rooms=15, theme=None, mix=None, memory=True):
+    """Play `turns` rounds over `n_sessions` bots; returns a stats dict."""
+    mix = mix or DEFAULT_MIX
+    sessions = _spawn(n_sessions, seed, rooms, theme, mix)
+    latencies = []
+    t0 = time.perf_counter()
+    _play(sessions, turns, latencies)
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    stats = {
+        "sessions": n_sessions,
+        "turns": len(latencies),
+        "turns_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "bytes_per_session": None,
+    }
+    if memory:
+        # Separate replay under tracemalloc so tracing doesn't skew the timings above.
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            replay = _spawn(n_sessions, seed, rooms, theme, mix)
+            _play(replay, turns)
+            stats["bytes_per_session"] = (tracemalloc.get_traced_memory()[0] - base) / n_sessions
+        finally:
+            tracemalloc.stop()
+    return stats
+
+HEADER = f"{'sessions':>8} {'turns':>8} {'turns/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KiB/sess':>9}"
+
+def format_row(s):
+    mem = f"{s['bytes_per_session'] / 1024:9.1f}" if s["bytes_per_session"] is not None else f"{'-':>9}"
+    return (
+        f"{s['sessions']:>8} {s['turns']:>8} {s['turns_per_s']:>10.0f} "
+        f"{s['p50_ms']:>8.3f} {s['p95_ms']:>8.3f} {s['p99_ms']:>8.3f} {mem}"
+    )
+
+def parse_mix(text):
+    """'walker=2,solver=1' -> {'walker': 2, 'solver': 1}; ValueError on bad input."""
+    mix = {}
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in BOTS:
+            raise ValueError(f"unknown bot {name!r} (choose from {', '.join(BOTS)})")
+        weight = weight.strip() or "1"
+        if not (weight.isascii() and weight.isdigit()):
+            raise ValueError(f"weight for {name} must be a whole number >= 0, not {weight!r}")
+        mix[name] = int(weight)
+    if mix and not any(mix.values()):
+        raise ValueError("at least one bot needs a weight above 0")
+    return mix or dict(DEFAULT_MIX)
+
+def main(levels, turns=200, seed=0, rooms=15, theme=None, mix=None, memory=True):
+    """Run one load level per entry in `levels`, printing a row as each finishes."""
+    print(HEADER, flush=True)
+    rows = []
+    for n in levels:
+        rows.append(run(n, turns=turns, seed=seed, rooms=rooms, theme=theme, mix=mix, memory=memory))
+        print(format_row(rows[-1]), flush=True)
+    return rows
@@ -0,0 +1,302 @@
+"""
+JSON-lines protocol over stdio, for bots and tools that embed the engine.
+
+One request per input line, one response per output line, in order:
+
+    {"session": "p1", "cmd": "look"}
+    {"session": "p1", "cmds": ["take lamp", "n", "map"], "id": 7}
+    {"session": "p1", "new": true, "seed": 5, "theme": "scifi", "rooms": 12}
+    {"session": "p1", "close": true}
+    {"session": "p1", "export": true}                  -> {"session": "p1", "snapshot": {...}}
+    {"session": "p1", "snapshot": {...}, "cmd": "look"}
+
+    {"id": 7, "session": "p1", "output": ["Taken.", "...", "..."],
+     "state": {"room": "r3", "name": "Library", "exits": {"north": {"to": "r8", "locked": false}},
+               "items": ["brass key"], "inventory": ["lamp"], "score": 1, "turns": 3, "over": false}}
+
+An unknown session is created on first use (with "seed", "theme", "rooms"
+if given). Sessions come from a `SessionManager`, so idle ones hibernate to
+disk and many can share one pipe. Errors come back as {"error": "..."} and
+the loop carries on. Output is buffered and flushed whenever no more input
+is waiting. "export" hands a session over as a compact snapshot (and drops
+it here); a request carrying a "snapshot" adopts it before running any
+commands. `adventure.cluster` uses these to move sessions between nodes.
+
+With `--fair`, requests are queued per session and run by the deficit
+round-robin `Scheduler`, so one client's long batches or `map all` floods
+cannot starve the others. Each command takes one slot of its session's
+queue; a full queue answers {"error": "backpressure"} and a batch longer
+than the whole queue {"error": "batch too large"}.
+"""
+import functools
+import json
+import select
+import socketserver
+import sys
+import threading
+
+from adventure.engine.scheduler import Scheduler, command_cost
+from adventure.engine.session import SessionManager
+
+
+def state_of(gs):
+    """Structured view of a session for clients."""
+    room = gs.room
+    return {
+        "room": room.id,
+        "name": room.name,
+        "exits": {d: {"to": ex.to, "locked": ex.locked} for d, ex in room.exits.items()},
+        "items": [it.name for it in room.items],
+        "inventory": [it.name for it in gs.inv],
+        "score": gs.score,
+        "turns": gs.turns,
+        "over": gs.over,
+    }
+
+
+_FIELDS = (("seed", int, "an integer"), ("rooms", int, "an integer"), ("theme", str, "a string"),
+           ("snapshot", dict, "an object"))
+
+
+class _Job:
+    """One request, split into steps so a scheduler can interleave its commands with other sessions'."""
+
+    def __init__(self, mgr, req):
+        if not isinstance(req, dict) or not isinstance(req.get("session"), str):
+            raise ValueError("request needs a \"session\" string")
+        cmds = req.get("cmds")
+        if cmds is None:
+            if "cmd" in req and not isinstance(req["cmd"], str):
+                raise ValueError("\"cmd\" must be a string")
+            cmds = [req["cmd"]] if "cmd" in req else []
+        if not isinstance(cmds, list) or not all(isinstance(c, str) for c in cmds):
+            raise ValueError("\"cmds\" must be a list of strings")
+        for name, kind, what in _FIELDS:
+            value = req.get(name)
+            if value is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+                raise ValueError(f"\"{name}\" must be {what}")
+        self.mgr = mgr
+        self.req = req
+        self.sid = req["session"]
+        self.cmds = [] if req.get("close") or req.get("export") else cmds
+        self.gs = None
+        self.snapshot = None
+        self.error = None  # set by the first step that fails; answered instead of output
+        self.output = []
+        self.resp = {"session": self.sid}
+        if "id" in req:
+            self.resp["id"] = req["id"]
+
+    # Each step catches its own failure, so one bad request is answered with an
+    # error for its session and never takes the serving loop down with it.
+
+    def begin(self):
+        self._guard(self._begin)
+
+    def run(self, cmd):
+        if self.error is None:
+            self._guard(self._run, cmd)
+
+    def end(self):
+        if self.error is None:
+            self._guard(self._end)
+        if self.error is not None:
+            return {**self.resp, "error": self.error}
+        return self.result
+
+    def steps(self, emit):
+        """
+        Scheduler work for this job: one (cost, fn) per command, the first
+        also beginning the job and the last also passing its answer to `emit`.
+        """
+        cmds = self.cmds or [None]
+        return [(0 if c is None else command_cost(c),
+                 functools.partial(self._step, i == 0, c, i == len(cmds) - 1, emit))
+                for i, c in enumerate(cmds)]
+
+    def _step(self, first, cmd, last, emit):
+        if first:
+            self.begin()
+        if cmd is not None:
+            self.run(cmd)
+        if last:
+            emit(self.end())
+
+    def _guard(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    def _begin(self):
+        mgr, req, sid = self.mgr, self.req, self.sid
+        if req.get("close"):
+            mgr.close(sid)
+        elif req.get("export"):
+            self.snapshot = mgr.export(sid)
+        elif req.get("snapshot") is not None:
+            self.gs = mgr.adopt(sid, req["snapshot"])
+        elif req.get("new") or sid not in mgr:
+            self.gs = mgr.create(sid, seed=req.get("seed"), theme=req.get("theme") or "fantasy",
+                                 rooms=int(req.get("rooms") or 15))
+        else:
+            self.gs = mgr.get(sid)
+
+    def _run(self, cmd):
+        if self.gs is None or self.gs.over:
+            return  # like execute_batch: nothing runs after quit
+        # other sessions' steps may have hibernated this one since the last step
+        gs = self.gs = self.mgr.get(self.sid)
+        self.output.extend(gs.apply(cmd))
+        if gs.over:
+            self.mgr.close(self.sid)
+
+    def _end(self):
+        if self.req.get("close"):
+            self.result = {**self.resp, "closed": True}
+        elif self.req.get("export"):
+            self.result = {**self.resp, "snapshot": self.snapshot}
+        else:
+            self.result = {**self.resp, "output": self.output, "state": state_of(self.gs)}
+
+
+def handle(mgr, req):
+    """Answer one decoded request, running all its commands now."""
+    try:
+        job = _Job(mgr, req)
+    except ValueError as e:
+        return {"error": str(e)}
+    job.begin()
+    for cmd in job.cmds:
+        job.run(cmd)
+    return job.end()
+
+
+def serve_stdio(mgr, inp=None, out=None):
+    """Answer requests from `inp` (bytes lines) on `out` until EOF; returns requests handled."""
+    inp = inp or sys.stdin.buffer
+    out = out or sys.stdout.buffer
+    n = 0
+    try:
+        for line in inp:
+            if not line.strip():
+                continue
+            try:
+                resp = handle(mgr, json.loads(line))
+            except ValueError as e:
+                resp = {"error": f"bad request: {e}"}
+            _write(out, resp)
+            n += 1
+            if not _more_input(inp):
+                out.flush()
+    finally:
+        out.flush()
+        mgr.hibernate_all()
+    return n
+
+
+def serve_stdio_fair(mgr, sched, inp=None, out=None):
+    """
+    Like `serve_stdio`, but requests go through `sched` (a `Scheduler`): a
+    reader thread queues them per session and this thread runs deficit
+    round-robin rounds. Responses can come back out of request order, so
+    clients match them by "session" and "id". A request that does not fit
+    its session's queue is answered at once with {"error": "backpressure"},
+    or {"error": "batch too large"} if it could never fit.
+    """
+    inp = inp or sys.stdin.buffer
+    out = out or sys.stdout.buffer
+    lock = threading.Lock()
+
+    def emit(resp):
+        with lock:
+            _write(out, resp)
+
+    def read():
+        try:
+            for line in inp:
+                if not line.strip():
+                    continue
+                try:
+                    job = _Job(mgr, json.loads(line))
+                    work = job.steps(emit)
+                except ValueError as e:
+                    emit({"error": f"bad request: {e}"})
+                    continue
+                except Exception as e:  # never let one request stop the reader
+                    emit({"error": f"bad request: {type(e).__name__}: {e}"})
+                    continue
+                if len(work) > sched.queue_limit:
+                    emit({**job.resp, "error": "batch too large", "limit": sched.queue_limit})
+                elif sched.submit(job.sid, work):
+                    continue
+                else:
+                    emit({**job.resp, "error": "backpressure", "queued": sched.queued(job.sid)})
+                with lock:
+                    out.flush()
+        finally:
+            sched.close()
+
+    reader = threading.Thread(target=read, name="serve-reader", daemon=True)
+    reader.start()
+    try:
+        while sched.wait():
+            sched.run_round()
+            with lock:
+                out.flush()
+    finally:
+        with lock:
+            out.flush()
+        mgr.hibernate_all()
+    reader.join()
+
+
+class _NodeHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        serve_stdio(self.server.mgr, self.rfile, self.wfile)
+
+
+class _NodeServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def serve_tcp(mgr, host="127.0.0.1", port=0):
+    """
+    Serve the protocol on a local TCP socket, one connection at a time (a
+    cluster router keeps one open per node). Prints "listening HOST:PORT"
+    once bound and runs until stdin closes, which is how a router stops it.
+    """
+    server = _NodeServer((host, port), _NodeHandler)
+    server.mgr = mgr
+    thread = threading.Thread(target=server.serve_forever, name="serve-node", daemon=True)
+    thread.start()
+    try:
+        print("listening %s:%d" % server.server_address[:2], flush=True)
+        sys.stdin.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+        mgr.hibernate_all()
+
+
+def _write(out, resp):
+    out.write(json.dumps(resp, separators=(",", ":")).encode() + b"\n")
+
+
+def _more_input(inp):
+    """Whether the OS already has more input for us (then flushing can wait)."""
+    try:
+        return bool(select.select([inp], [], [], 0)[0])
+    except (OSError, ValueError):  # no real file descriptor (tests, wrapped streams)
+        return False
+
+
+def main(directory="sessions", idle_seconds=600.0, max_resident=1000, fair=False, queue_limit=64,
+         port=None):
+    mgr = SessionManager(directory, idle_seconds=idle_seconds, max_resident=max_resident)
+    if port is not None:
+        serve_tcp(mgr, port=port)
+    elif fair:
+        serve_stdio_fair(mgr, Scheduler(queue_limit=queue_limit))
+    else:
+        serve_stdio(mgr)
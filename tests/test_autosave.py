@@ -0,0 +1,63 @@
+import json
+import threading
+
+from adventure.engine import save
+from adventure.engine.autosave import Autosaver
+from adventure.engine.loop import new_game, restore_game
+from adventure.engine.save import read_save
+
+
+def test_autosave_writes_latest_state(tmp_path):
+    gs = new_game(seed=9, rooms=10)
+    saver = Autosaver()
+    path = str(tmp_path / "auto.json")
+    for cmd in ["look", "inventory", "look", "map"]:
+        gs.apply(cmd)
+        saver.request("p1", gs, path)
+    saver.close()
+    assert restore_game(read_save(path)).turns == 4
+    assert not (tmp_path / "auto.json.tmp").exists()
+
+
+def test_requests_coalesce_while_disk_is_slow(tmp_path, monkeypatch):
+    gate = threading.Event()
+    writes = []
+    real = save._write_atomic
+
+    def slow_write(path, text):
+        gate.wait(5)
+        writes.append(json.loads(text)["turns"])
+        real(path, text)
+
+    monkeypatch.setattr("adventure.engine.autosave._write_atomic", slow_write)
+    gs = new_game(seed=9, rooms=10)
+    saver = Autosaver()
+    path = str(tmp_path / "auto.json")
+    for _ in range(20):
+        gs.apply("look")
+        saver.request("p1", gs, path)  # never blocks on the stalled write
+    gate.set()
+    assert saver.flush(5)
+    saver.close()
+    assert writes[-1] == 20 and len(writes) <= 3
+
+
+def test_failed_writes_are_reported_once_and_never_stall(tmp_path, monkeypatch):
+    gs = new_game(seed=9, rooms=10)
+    saver = Autosaver()
+    bad = str(tmp_path / "missing" / "auto.json")
+    for _ in range(3):
+        saver.request("p1", gs, bad)
+        assert saver.flush(5)
+    assert len(saver.errors) == 3
+    assert saver.new_errors() == [f"Autosave to {bad} failed: {saver.errors[0][1]}"]
+    assert saver.new_errors() == []
+
+    def broken(path, text):
+        raise TypeError("not an OSError")
+
+    monkeypatch.setattr("adventure.engine.autosave._write_atomic", broken)
+    saver.request("p1", gs, str(tmp_path / "other.json"))
+    assert saver.flush(5)  # the writer survived and is not stuck busy
+    assert len(saver.new_errors()) == 1
+    saver.close(5)
@@ -0,0 +1,24 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from adventure.engine.batch import make_skeletons, expand
+
+
+def test_skeleton_depends_only_on_its_seed():
+    a = make_skeletons(range(20), n_rooms=15, theme="horror")
+    b = make_skeletons([99, 7, 3], n_rooms=15, theme="horror")
+    for field in ("order", "arch", "edge_a", "edge_b", "edge_da", "lock", "key_room", "artifact_room"):
+        assert (getattr(b, field)[1] == getattr(a, field)[7]).all()
+
+
+def test_expand_builds_linked_world():
+    sk = make_skeletons(range(200), n_rooms=12)
+    for i in range(0, 200, 7):
+        w = expand(sk, i)
+        assert len(w.rooms) == 12 and w.start in w.rooms
+        assert set(w.layout) == set(w.rooms)
+        for r in w.rooms.values():
+            for ex in r.exits.values():
+                assert any(back.to == r.id and back.locked == ex.locked
+                           for back in w.rooms[ex.to].exits.values())
@@ -0,0 +1,37 @@
+import random
+
+from adventure.engine.campaign import Campaign, check_world
+from adventure.engine.gen import make_world
+from adventure.loadtest import GreedySolver
+
+
+def test_campaign_moves_on_and_carries_score():
+    camp = Campaign(seed=5, rooms=10, prefetch=2)
+    bot = GreedySolver(random.Random(5))
+    try:
+        while camp.level < 3:
+            before = camp.gs.score
+            out = camp.apply(bot.next_command(camp.gs))
+            if len(out) > 1:
+                assert out[-1].startswith("Beyond the vault") and camp.gs.score == before + 10
+                assert camp.gs.room.id == camp.gs.world.start
+        assert camp.gs.world.seed == camp.level_params(3)[0]
+    finally:
+        camp.close()
+
+
+def test_prefetch_depth_and_cancel():
+    camp = Campaign(seed=1, rooms=10, prefetch=3)
+    assert len(camp._ahead) == 3
+    camp.set_prefetch(1)
+    assert len(camp._ahead) == 1
+    camp.cancel()
+    assert not camp._ahead
+    assert camp.advance().startswith("Beyond the vault")  # built on demand
+    assert camp.level == 2 and len(camp._ahead) == 1
+    camp.close()
+    assert Campaign(seed=1, rooms=10, prefetch=0).level_params(2) == camp.level_params(2)
+
+
+def test_worlds_pass_the_check():
+    assert all(check_world(make_world(seed=s, n_rooms=10)) for s in range(20))
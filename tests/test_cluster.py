@@ -0,0 +1,127 @@
+import io
+import json
+import random
+
+import pytest
+
+from adventure.cluster import HashRing, Router, serve_router, spawn_node
+from adventure.engine.loop import new_game, restore_game
+from adventure.engine.save import _state_dict, snapshot_state
+from adventure.engine.session import SessionManager
+from adventure.loadtest import GreedySolver
+from adventure.serve import handle
+
+
+def test_adding_a_node_moves_only_its_share():
+    ring = HashRing([f"n{i}" for i in range(4)])
+    keys = [f"s{i}" for i in range(5000)]
+    before = {k: ring.node_for(k) for k in keys}
+    ring.add("n4")
+    moved = [k for k in keys if ring.node_for(k) != before[k]]
+    assert 0.1 < len(moved) / len(keys) < 0.3
+    assert all(ring.node_for(k) == "n4" for k in moved)
+    ring.remove("n4")
+    assert {k: ring.node_for(k) for k in keys} == before
+
+
+def test_snapshot_is_compact_and_restores(tmp_path):
+    gs = new_game(seed=6, rooms=15)
+    bot = GreedySolver(random.Random(6))
+    for _ in range(15):
+        gs.apply(bot.next_command(gs))
+    snap = snapshot_state(gs)
+    assert len(snap["rooms"]) < len(gs.world.rooms)
+    assert _state_dict(restore_game(snap)) == _state_dict(gs)
+
+    a, b = SessionManager(tmp_path / "a"), SessionManager(tmp_path / "b")
+    handle(a, {"session": "p", "seed": 3, "rooms": 10, "cmds": ["look", "n"]})
+    moved = handle(a, {"session": "p", "export": True})["snapshot"]
+    assert "p" not in a
+    resp = handle(b, {"session": "p", "snapshot": moved, "cmd": "i"})
+    assert resp["state"]["turns"] == 3
+    assert handle(a, {"session": "gone", "export": True})["snapshot"] is None
+
+
+def test_router_moves_live_sessions_between_nodes(tmp_path):
+    router = Router(vnodes=32)
+    try:
+        for name in ("n1", "n2"):
+            router.add_node(name, spawn_node(str(tmp_path / name)))
+        states = {}
+        for i in range(20):
+            resp = router.request({"session": f"p{i}", "seed": i, "rooms": 10, "cmds": ["look", "n", "e"]})
+            states[f"p{i}"] = resp["state"]
+        owners = dict(router.owner)
+
+        moved = router.add_node("n3", spawn_node(str(tmp_path / "n3")))
+        assert 0 < moved < 20
+        assert sum(owners[s] != n for s, n in router.owner.items()) == moved
+        on_n1 = sum(n == "n1" for n in router.owner.values())
+        assert router.remove_node("n1") == on_n1
+
+        for sid, state in states.items():
+            resp = router.request({"session": sid, "cmd": "i"})
+            assert resp["state"]["room"] == state["room"] and resp["state"]["turns"] == state["turns"] + 1
+        assert set(router.status()) == {"n2", "n3"}
+    finally:
+        router.close()
+
+
+class _FakeNode:
+    """In-memory NodeClient; imports raise while `broken` and are refused while `refusing`."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.broken = False
+        self.refusing = False
+
+    def call(self, req):
+        sid = req["session"]
+        if req.get("export"):
+            return {"snapshot": self.sessions.pop(sid, None)}
+        if "snapshot" in req:
+            if self.broken:
+                raise ConnectionError("node went away")
+            if self.refusing:
+                return {"error": "bad snapshot"}
+            self.sessions[sid] = req["snapshot"]
+        self.sessions.setdefault(sid, {"sid": sid})
+        return {"state": {"over": False}}
+
+    def close(self):
+        pass
+
+
+def test_failed_remove_keeps_the_node_and_its_sessions():
+    router = Router(vnodes=8)
+    n1, n2 = _FakeNode(), _FakeNode()
+    router.add_node("n1", n1)
+    for i in range(20):
+        router.request({"session": f"p{i}", "cmd": "look"})
+    router.add_node("n2", n2)
+    n2.broken = True
+    with pytest.raises(ConnectionError):
+        router.remove_node("n1")
+    assert "n1" in router.ring and "n1" in router.nodes
+    assert len(n1.sessions) + len(n2.sessions) == 20
+    assert all(sid in router.nodes[n].sessions for sid, n in router.owner.items())
+
+    del router.nodes["n2"]  # a node dropped without its sessions being moved
+    router.ring.remove("n2")
+    out = io.BytesIO()
+    serve_router(router, None, io.BytesIO(b"".join(
+        json.dumps({"session": sid, "cmd": "i"}).encode() + b"\n" for sid in router.owner)), out)
+    assert all("error" not in json.loads(line) for line in out.getvalue().splitlines())
+
+
+def test_refused_snapshot_goes_back_to_its_node():
+    router = Router(vnodes=8)
+    n1, n2 = _FakeNode(), _FakeNode()
+    router.add_node("n1", n1)
+    for i in range(20):
+        router.request({"session": f"p{i}", "cmd": "look"})
+    n2.refusing = True
+    with pytest.raises(RuntimeError, match="refused"):
+        router.add_node("n2", n2)
+    assert len(n1.sessions) == 20 and not n2.sessions
+    assert set(router.owner.values()) == {"n1"}
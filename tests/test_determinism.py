@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from adventure.engine.gen import make_world
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+FINGERPRINT = """
+import hashlib, json, sys
+from dataclasses import asdict
+from adventure.engine.gen import make_world
+out = []
+for theme in ("fantasy", "scifi", "horror"):
+    for seed in range(40):
+        w = make_world(seed=seed, n_rooms=8 + seed % 8, theme=theme)
+        out.append(json.dumps(asdict(w), sort_keys=True))
+sys.stdout.write(hashlib.sha256("\\n".join(out).encode()).hexdigest())
+"""
+
+
+def _fingerprint_in_subprocess(hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed), PYTHONPATH=SRC)
+    res = subprocess.run([sys.executable, "-c", FINGERPRINT], env=env,
+                         capture_output=True, text=True, check=True)
+    return res.stdout
+
+
+def test_same_seed_same_world_across_processes():
+    assert _fingerprint_in_subprocess(1) == _fingerprint_in_subprocess(2)
+
+
+def test_stored_seed_is_requested_seed():
+    w = make_world(seed=4242)
+    assert w.seed == 4242
+    again = make_world(seed=w.seed)
+    assert asdict(again) == asdict(w)
+    assert make_world().seed is not None
@@ -0,0 +1,18 @@
+from adventure.engine.loop import new_game, execute_batch
+
+
+def test_apply_returns_outputs_without_printing(capsys):
+    gs = new_game(seed=5, rooms=10)
+    out = gs.apply(["look", "inventory", "blorf"])
+    assert len(out) == 3
+    assert out[1] == "You are carrying nothing."
+    assert out[2] == "I don't understand that."
+    assert capsys.readouterr().out == ""
+
+
+def test_batch_buffer_stops_at_quit():
+    gs = new_game(seed=5, rooms=10)
+    buf = execute_batch(gs, ["i", "quit", "look"], join=True)
+    assert buf.splitlines()[-1].startswith("Score:")
+    assert gs.over and gs.turns == 2
+    assert gs.apply("look") == []
@@ -0,0 +1,39 @@
+from adventure import fuzz
+from adventure.engine.gen import make_world
+
+
+def test_generated_worlds_pass():
+    done, found = fuzz.run(range(0, 20), sizes=[8, 12, 15], workers=2, chunk=5)
+    assert done == 20 * 3 * 3 and found == {}
+
+
+def test_check_catches_broken_worlds():
+    w = make_world(seed=4, n_rooms=12)
+    rid, d, ex = next((rid, d, ex) for rid, r in w.rooms.items() for d, ex in r.exits.items() if ex.locked)
+    back = next(e for e in w.rooms[ex.to].exits.values() if e.to == rid)
+    back.locked = False
+    assert fuzz.check(w)[0] == "twin"
+
+    w = make_world(seed=4, n_rooms=12)
+    rid, d, ex = next((rid, d, ex) for rid, r in w.rooms.items() for d, ex in r.exits.items())
+    del w.rooms[ex.to].exits[next(d2 for d2, e in w.rooms[ex.to].exits.items() if e.to == rid)]
+    assert fuzz.check(w)[0] == "reverse"
+
+    w = make_world(seed=4, n_rooms=12)
+    vault = next(r for r in w.rooms.values() if any(not it.portable for it in r.items))
+    w.rooms[w.start].items.append(vault.items[0])
+    assert fuzz.check(w)[0] == "vault"
+
+
+def test_shrink_finds_the_smallest_seed_and_size(monkeypatch):
+    def fake(seed, theme, size):
+        return ("fake", "boom") if seed % 7 == 3 and size >= 12 else None
+    monkeypatch.setattr(fuzz, "check_case", fake)
+    assert fuzz.shrink("fake", 45, "fantasy", 15) == (3, 12, "boom")
+    assert fuzz.shrink("fake", 45, "fantasy", 15, shrink_limit=0) == (45, 12, "boom")
+
+
+def test_parse_range():
+    assert fuzz.parse_range("5:9") == range(5, 9)
+    assert fuzz.parse_range("8-15") == range(8, 16)
+    assert fuzz.parse_range("7") == range(7, 8)
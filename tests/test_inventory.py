@@ -0,0 +1,52 @@
+import copy
+import json
+import pickle
+from dataclasses import asdict
+
+from adventure.engine.inventory import Inventory
+from adventure.engine.loop import new_game, restore_game
+from adventure.engine.save import _state_dict
+from adventure.engine.world import Item
+
+
+def _items():
+    return [
+        Item(name="rune key 1", tags=["key:rune1", "key"]),
+        Item(name="rune key 1 copy", tags=["key:rune1", "key"]),
+        Item(name="sun shard", tags=["artifact:sun"]),
+        Item(name="note", tags=["note", "paper"]),
+    ]
+
+
+def test_tallies_follow_every_list_edit():
+    key, copy, shard, note = _items()
+    inv = Inventory([key, shard])
+    inv.append(copy)
+    inv.insert(0, note)
+    assert inv.key_tags == {"key:rune1": 2} and inv.artifacts == 1 and inv.ns_counts["note"] == 1
+    inv.remove(key)
+    assert inv.holds_key("key:rune1")
+    del inv[-1:]  # the copy
+    assert not inv.holds_key("key:rune1") and not inv.key_tags
+    assert inv.pop() is shard and inv.artifacts == 0
+    inv[0] = shard
+    assert inv.artifacts == 1 and inv.ns_counts["note"] == 0
+    assert inv == [shard] and isinstance(inv, list)
+
+
+def test_inventory_serializes_like_a_list():
+    gs = new_game(seed=1, rooms=10)
+    for it in _items():
+        gs.inv.append(it)
+    data = json.loads(json.dumps(_state_dict(gs)))
+    assert data["inv"] == [asdict(it) for it in _items()]
+    back = restore_game(data)
+    assert isinstance(back.inv, Inventory) and back.inv.key_tags == {"key:rune1": 2}
+
+
+def test_copies_and_pickles_keep_the_tallies():
+    inv = Inventory(_items())
+    for other in (copy.copy(inv), copy.deepcopy(inv), pickle.loads(pickle.dumps(inv))):
+        assert type(other) is Inventory and [it.name for it in other] == [it.name for it in inv]
+        assert other.key_tags == inv.key_tags == {"key:rune1": 2}
+        assert other.ns_counts == inv.ns_counts
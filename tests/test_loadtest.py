@@ -0,0 +1,23 @@
+import pytest
+
+from adventure.loadtest import parse_mix, percentile, run
+
+
+def test_percentile_nearest_rank():
+    vals = list(range(1, 101))
+    assert percentile(vals, 50) == 50
+    assert percentile(vals, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_run_reports_every_turn():
+    stats = run(3, turns=20, rooms=10, memory=False)
+    assert stats["turns"] == 60
+    assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+
+def test_parse_mix_rejects_weights_that_leave_no_bots():
+    assert parse_mix("walker=0,solver=2") == {"walker": 0, "solver": 2}
+    for bad in ("walker=0", "walker=0,solver=0", "walker=lots", "walker=-1", "walker=²"):
+        with pytest.raises(ValueError):
+            parse_mix(bad)
@@ -0,0 +1,41 @@
+import copy
+import pickle
+
+from adventure.engine.loop import new_game
+from adventure.engine.spatial import CHUNK, MapCoords
+
+
+def test_index_follows_dict_edits():
+    m = MapCoords({"a": (0, 0, 0), "b": (CHUNK, -1, 0)})
+    m["c"] = (-CHUNK - 3, 5, 2)
+    m["a"] = (1, 1, 0)
+    m.pop("b")
+    assert m.at(1, 1, 0) == "a" and m.at(0, 0, 0) is None and m.at(CHUNK, -1, 0) is None
+    assert m.window(2, -100, 100, -100, 100) == {(-CHUNK - 3, 5): "c"}
+    assert m.levels == {0: 1, 2: 1}
+
+
+def test_viewport_crops_the_map():
+    gs = new_game(seed=1, rooms=15)
+    gs.map_coords = MapCoords(gs.world.layout)
+    full = gs.apply("map 50")[0]
+    near = gs.apply("map 0")[0]
+    assert "[@]" in near and near.count("[") < full.count("[")
+    assert "outside this view" in near and "outside this view" not in full
+
+
+def test_radius_is_capped():
+    gs = new_game(seed=1, rooms=15)
+    assert gs.apply("map 1000000")[0] == gs.apply("map 64")[0]
+
+
+def test_non_ascii_digits_are_not_a_radius():
+    gs = new_game(seed=1, rooms=15)
+    assert gs.apply("map ²")[0] == gs.apply("map")[0]
+
+
+def test_copies_and_pickles_keep_the_index():
+    coords = MapCoords({"a": (0, 0, 0), "b": (20, 3, 0), "c": (1, 1, 1)})
+    for other in (copy.copy(coords), copy.deepcopy(coords), pickle.loads(pickle.dumps(coords))):
+        assert type(other) is MapCoords and other == coords
+        assert other.chunks == coords.chunks and other.levels == coords.levels == {0: 2, 1: 1}
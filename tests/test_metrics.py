@@ -0,0 +1,50 @@
+import sys
+import threading
+
+from adventure.engine import metrics
+from adventure.engine.loop import new_game, step
+
+
+def test_turns_and_verbs_are_counted():
+    before = metrics.COMMANDS.value("look")
+    gs = new_game(seed=3, rooms=10)
+    step(gs, "look")
+    step(gs, "l")
+    assert metrics.COMMANDS.value("look") == before + 2
+    text = metrics.REGISTRY.render()
+    assert "# TYPE infoprox_turns_total counter" in text
+    assert 'infoprox_commands_total{verb="look"}' in text
+    assert "infoprox_worldgen_seconds_count" in text
+    assert "infoprox_sessions_active" in text
+
+
+def test_textfile_dump(tmp_path):
+    path = tmp_path / "infoprox.prom"
+    metrics.write_textfile(path)
+    assert path.read_text().startswith("# HELP")
+
+
+def test_render_while_other_threads_add_labels():
+    reg = metrics.Registry()
+    c = reg.counter("t_total", "Test.", label="k")
+    s = reg.summary("t_seconds", "Test.", label="k")
+
+    def work():
+        for i in range(20000):
+            c.inc(label=i)
+            s.observe(0.5, label=i % 500)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often, mid-update
+    try:
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            reg.render()
+    finally:
+        sys.setswitchinterval(interval)
+        for t in threads:
+            t.join()
+    assert sum(c.values.values()) == 80000 and c.value(7) == 4
+    assert sum(s.values.values()) == 80000
@@ -0,0 +1,26 @@
+import random
+
+from adventure.engine.loop import new_game
+from adventure.engine.progress import Progress, progress_of
+from adventure.loadtest import GreedySolver
+
+
+def test_incremental_matches_rebuild():
+    for seed in range(20):
+        gs = new_game(seed=seed, rooms=12)
+        bot = GreedySolver(random.Random(seed))
+        p = progress_of(gs)
+        for _ in range(60):
+            gs.apply(bot.next_command(gs))
+            fresh = Progress(gs.world)
+            assert sorted(p.reachable_rooms(gs.room.id)) == sorted(fresh.reachable_rooms(gs.room.id))
+            assert p.loot_rooms(gs) == fresh.loot_rooms(gs)
+            assert sorted(p.frontier(gs)) == sorted(fresh.frontier(gs))
+            assert p.can_finish(gs)
+        assert p.gate_open(), seed
+
+
+def test_hint_verb():
+    gs = new_game(seed=3, rooms=10)
+    out = gs.apply("hint")[0]
+    assert out.startswith("You can reach ") and "of 10 rooms" in out
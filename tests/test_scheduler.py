@@ -0,0 +1,98 @@
+import io
+import json
+
+from adventure.engine.scheduler import Scheduler, command_cost
+from adventure.engine.session import SessionManager
+from adventure.serve import _Job, serve_stdio_fair
+
+
+def test_costs():
+    assert command_cost("look") == 1
+    assert command_cost("map") < command_cost("map all") < command_cost("map all 40")
+    assert command_cost("map all 1000000") == command_cost("map all 64")
+
+
+def test_deficit_round_robin_keeps_light_sessions_moving():
+    sched = Scheduler(queue_limit=100, quantum=4)
+    done = []
+    heavy = [(command_cost("map all"), lambda: done.append("heavy"))] * 50
+    light = [(1, lambda: done.append("light"))] * 12
+    assert sched.submit("flood", heavy) and sched.submit("player", light)
+    rounds = 0
+    while done.count("light") < 12:
+        sched.run_round()
+        rounds += 1
+    # 4 light commands per round, while the flood earns one map-all every other round
+    assert rounds == 3 and done.count("heavy") == 1
+
+
+def test_backpressure_is_all_or_nothing():
+    sched = Scheduler(queue_limit=5)
+    assert sched.submit("p", [(1, None)] * 4)
+    assert not sched.submit("p", [(1, None)] * 2)
+    assert sched.queued("p") == 4 and sched.submit("q", [(1, None)] * 5)
+
+
+def test_fair_serve_answers_every_request(tmp_path):
+    reqs = [{"session": "a", "seed": 1, "rooms": 10, "cmds": ["map all"] * 10, "id": 1},
+            {"session": "b", "seed": 2, "rooms": 10, "cmd": "look", "id": 2},
+            {"session": "a", "cmds": ["look"] * 80, "id": 3}]
+    inp = io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in reqs))
+    out = io.BytesIO()
+    serve_stdio_fair(SessionManager(tmp_path), Scheduler(queue_limit=64), inp, out)
+    resps = {r["id"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert resps[1]["state"]["turns"] == 10 and resps[2]["state"]["turns"] == 1
+    assert resps[3]["error"] == "batch too large"
+
+
+def test_fair_serve_fits_a_batch_as_long_as_the_queue(tmp_path):
+    req = {"session": "a", "seed": 1, "rooms": 10, "cmds": ["look"] * 8, "id": 1}
+    out = io.BytesIO()
+    serve_stdio_fair(SessionManager(tmp_path), Scheduler(queue_limit=8),
+                     io.BytesIO(json.dumps(req).encode() + b"\n"), out)
+    assert json.loads(out.getvalue())["state"]["turns"] == 8
+
+
+def test_fair_serve_survives_a_bad_request(tmp_path):
+    reqs = [{"session": "a", "rooms": "abc", "cmd": "look", "id": 1},
+            {"session": "b", "snapshot": {"seed": 1}, "cmd": "look", "id": 2},
+            {"session": "c", "seed": 3, "rooms": 10, "cmd": "look", "id": 3}]
+    inp = io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in reqs))
+    out = io.BytesIO()
+    serve_stdio_fair(SessionManager(tmp_path), Scheduler(), inp, out)
+    resps = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert resps[0]["error"] == 'bad request: "rooms" must be an integer'
+    errors = {r["id"]: r for r in resps[1:]}
+    assert errors[2]["session"] == "b" and errors[2]["error"].startswith("KeyError")
+    assert errors[3]["state"]["turns"] == 1
+
+
+def test_interleaved_job_follows_its_session_through_hibernation(tmp_path):
+    mgr = SessionManager(tmp_path, max_resident=1)
+    a = _Job(mgr, {"session": "a", "seed": 1, "rooms": 10, "cmds": ["look"] * 3})
+    b = _Job(mgr, {"session": "b", "seed": 2, "rooms": 10, "cmd": "look"})
+    a.begin()
+    a.run("look")
+    b.begin()  # only one session fits: this hibernates a mid-job
+    a.run("look")
+    b.run("look")
+    a.run("look")
+    assert a.end()["state"]["turns"] == 3
+    assert mgr.get("a").turns == 3
+
+
+def test_fair_serve_reader_survives_a_failing_cost(tmp_path, monkeypatch):
+    def cost(cmd):
+        if cmd == "boom":
+            raise RuntimeError("no cost for that")
+        return command_cost(cmd)
+
+    monkeypatch.setattr("adventure.serve.command_cost", cost)
+    reqs = [{"session": "a", "seed": 1, "rooms": 10, "cmd": "boom", "id": 1},
+            {"session": "b", "seed": 2, "rooms": 10, "cmd": "look", "id": 2}]
+    inp = io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in reqs))
+    out = io.BytesIO()
+    serve_stdio_fair(SessionManager(tmp_path), Scheduler(), inp, out)
+    resps = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert resps[0]["error"] == "bad request: RuntimeError: no cost for that"
+    assert resps[1]["id"] == 2 and resps[1]["state"]["turns"] == 1
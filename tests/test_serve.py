@@ -0,0 +1,49 @@
+import io
+import json
+
+from adventure.engine.session import SessionManager
+from adventure.serve import serve_stdio
+
+
+def _run(tmp_path, *reqs):
+    inp = io.BytesIO(b"".join((r if isinstance(r, bytes) else json.dumps(r).encode()) + b"\n" for r in reqs))
+    out = io.BytesIO()
+    serve_stdio(SessionManager(tmp_path), inp, out)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_sessions_share_one_pipe(tmp_path):
+    a1, b1, bad, a2 = _run(
+        tmp_path,
+        {"session": "a", "seed": 3, "rooms": 10, "cmd": "look"},
+        {"session": "b", "seed": 4, "cmds": ["i", "look"], "id": 9},
+        b"{oops",
+        {"session": "a", "cmds": ["inventory", "quit"]},
+    )
+    assert a1["state"]["turns"] == 1 and a1["output"][0].startswith("You are in")
+    assert b1["id"] == 9 and len(b1["output"]) == 2 and b1["state"]["inventory"] == []
+    assert "error" in bad
+    assert a2["state"]["over"] and a2["state"]["turns"] == 3
+    assert set(a1["state"]) >= {"room", "exits", "inventory", "score", "turns"}
+
+
+def test_sessions_resume_from_disk(tmp_path):
+    _run(tmp_path, {"session": "p", "seed": 8, "rooms": 10, "cmds": ["look", "look"]})
+    (again,) = _run(tmp_path, {"session": "p", "cmd": "i"})
+    assert again["state"]["turns"] == 3
+
+
+def test_wrong_field_types_are_answered_not_fatal(tmp_path):
+    *bad, good = _run(
+        tmp_path,
+        {"session": "a", "rooms": [1], "cmd": "look"},
+        {"session": "a", "theme": 5, "cmd": "look"},
+        {"session": "a", "seed": "x", "cmd": "look"},
+        {"session": "a", "cmd": 5},
+        {"session": "a", "seed": 2, "rooms": 10, "cmd": "look"},
+    )
+    assert [r["error"] for r in bad] == [
+        '"rooms" must be an integer', '"theme" must be a string',
+        '"seed" must be an integer', '"cmd" must be a string',
+    ]
+    assert good["output"][0].startswith("You are in")
@@ -0,0 +1,40 @@
+from adventure.engine.session import SessionManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_transparent_resume(tmp_path):
+    mgr = SessionManager(tmp_path, idle_seconds=1e9, max_resident=2)
+    for sid in ("a", "b", "c"):
+        mgr.create(sid, seed=7, rooms=10)
+    assert list(mgr.resident) == ["b", "c"]
+    assert "a" in mgr and (tmp_path / "a.json").exists()
+
+    before = mgr.execute("b", "look")
+    assert "a" not in mgr.resident
+    mgr.execute("a", "inventory")  # resumes a, evicts c
+    assert list(mgr.resident) == ["b", "a"]
+    assert mgr.get("a").turns == 1
+    assert mgr.execute("b", "look") == before
+
+
+def test_idle_sessions_hibernate(tmp_path):
+    clock = FakeClock()
+    mgr = SessionManager(tmp_path, idle_seconds=60, max_resident=100, clock=clock)
+    gs = mgr.create("p1", seed=3, rooms=12)
+    room = gs.room.id
+    mgr.create("p2", seed=4, rooms=12)
+    clock.now = 30
+    mgr.execute("p2", "look")
+    clock.now = 70
+    mgr.sweep()
+    assert list(mgr.resident) == ["p2"]
+    assert mgr.get("p1").room.id == room
+    mgr.execute("p1", "quit")
+    assert "p1" not in mgr
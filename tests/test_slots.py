@@ -0,0 +1,71 @@
+from adventure.engine.loop import load_game, new_game, restore_game
+from adventure.engine.slots import SlotManager
+
+
+def test_slots_index_list_and_reload(tmp_path):
+    mgr = SlotManager(tmp_path)
+    gs = new_game(seed=11, theme="scifi", rooms=10)
+    gs.apply(["look", "inventory"])
+    assert mgr.save(gs, "first") == "Game saved to slot first."
+    gs.apply("look")
+    mgr.save(gs, "second")
+    mgr.save(gs, "first")  # re-save moves it to the front
+
+    again = SlotManager(tmp_path)  # index only, no save files opened
+    assert [e["slot"] for e in again.list()] == ["first", "second"]
+    e = again.list()[0]
+    assert (e["seed"], e["theme"], e["n_rooms"], e["turns"]) == (11, "scifi", 10, 3)
+    assert restore_game(again.read("second")).turns == 3
+
+
+def test_prune_and_compaction(tmp_path):
+    mgr = SlotManager(tmp_path)
+    gs = new_game(seed=2, rooms=10)
+    for i in range(30):
+        mgr.record(f"s{i}", {"seed": 2, "theme": "fantasy", "n_rooms": 10, "score": 0, "turns": i, "time": i})
+    for _ in range(50):
+        mgr.save(gs, "auto")
+    lines = (tmp_path / "index.jsonl").read_text().splitlines()
+    assert len(lines) <= 2 * len(mgr) + 16
+
+    gone = mgr.prune(keep=5)
+    assert "auto" not in gone and len(mgr) == 5
+    assert len(SlotManager(tmp_path)) == 5
+    assert mgr.prune(older_than=1e6, now=100) == []
+    assert mgr.prune(older_than=10, now=100) == ["s29", "s28", "s27", "s26"]
+
+
+def test_torn_index_line_is_skipped(tmp_path):
+    mgr = SlotManager(tmp_path)
+    mgr.record("ok", {"time": 1})
+    with open(tmp_path / "index.jsonl", "a") as f:
+        f.write('{"slot": "half')
+    again = SlotManager(tmp_path)
+    again.record("next", {"time": 2})
+    assert sorted(SlotManager(tmp_path).entries) == ["next", "ok"]
+
+
+def test_foreign_index_lines_are_dropped(tmp_path):
+    mgr = SlotManager(tmp_path)
+    mgr.record("ok", {"time": 1})
+    with open(tmp_path / "index.jsonl", "a") as f:
+        f.write('[1, 2]\n"text"\n{"time": 3}\n{"slot": 7}\n')
+    assert list(SlotManager(tmp_path).entries) == ["ok"]
+    assert (tmp_path / "index.jsonl").read_text().count("\n") == 1
+
+
+def test_compaction_keeps_slots_saved_by_another_manager(tmp_path):
+    a, b = SlotManager(tmp_path), SlotManager(tmp_path)
+    a.record("alice", {"time": 1})
+    for i in range(20):
+        b.record("bob", {"time": 2 + i})
+    assert sorted(SlotManager(tmp_path).entries) == ["alice", "bob"]
+    assert (tmp_path / "index.jsonl").read_text().count("\n") < 20
+
+
+def test_loaded_game_saves_slots_in_its_directory(tmp_path, monkeypatch):
+    SlotManager(tmp_path).save(new_game(seed=4, rooms=10), "start")
+    cmds = iter(["look", "save later", "quit"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(cmds))
+    load_game(slot="start", saves_dir=str(tmp_path))
+    assert "later" in SlotManager(tmp_path)
@@ -8,3 +8,33 @@ def test_world_builds():
 def test_parser_dirs():
     assert parse("n")[0] == "go"
     assert parse("go north")[1]["dir"] == "north"
+
+def test_layout_is_collision_free():
+    for seed in range(50):
+        w = make_world(seed=seed, n_rooms=15)
+        assert set(w.layout) == set(w.rooms)
+        assert len(set(w.layout.values())) == len(w.rooms)
+        assert w.layout[w.start] == (0, 0, 0)
+
+def test_every_world_is_solvable():
+    # collect whatever is reachable, open what the bag allows, repeat until stuck
+    for seed in range(200):
+        w = make_world(seed=seed, n_rooms=8 + seed % 8)
+        keys, artifacts, opened = set(), set(), False  # keys: every tag in the bag
+        while True:
+            seen, stack = {w.start}, [w.start]
+            while stack:
+                for ex in w.rooms[stack.pop()].exits.values():
+                    gate = ex.key_tag == "goal:artifacts3"
+                    if ex.locked and not (ex.key_tag in keys or (gate and len(artifacts) >= 3)):
+                        continue
+                    opened |= gate
+                    if ex.to not in seen:
+                        seen.add(ex.to)
+                        stack.append(ex.to)
+            bag = {t for r in seen for it in w.rooms[r].items for t in it.tags}
+            if bag <= keys:
+                break
+            keys = bag
+            artifacts = {t for t in bag if t.startswith("artifact:")}
+        assert opened, seed
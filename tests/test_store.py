@@ -0,0 +1,60 @@
+from adventure.engine.gen import make_world
+from adventure.engine.loop import GameState, step
+from adventure.engine.store import SQLiteRooms, open_world
+
+SCRIPT = ["look", "n", "s", "e", "w", "take key", "take scroll", "unlock", "u", "d",
+          "map all", "i", "e", "e", "take shard", "n", "n", "w", "unlock", "look"]
+
+
+def _play(world):
+    gs = GameState(world=world, room=world.rooms[world.start])
+    gs.map_coords[gs.room.id] = world.layout[gs.room.id]
+    out = []
+    for cmd in SCRIPT * 3:
+        out.append(step(gs, cmd)[1])
+        # wander through whatever is open so the cache has to cycle
+        for d, ex in gs.room.exits.items():
+            if not ex.locked:
+                out.append(step(gs, d)[1])
+                break
+    return out, gs
+
+
+def test_store_backed_world_plays_like_dict_world(tmp_path):
+    plain, gs_plain = _play(make_world(seed=11, n_rooms=15))
+    store = SQLiteRooms(tmp_path / "w.db", cache_size=2)
+    stored, gs_stored = _play(make_world(seed=11, n_rooms=15, store=store))
+    assert stored == plain
+    assert len(store) == 15 and len(store.cache) <= 2
+    store.close()
+
+    again = open_world(tmp_path / "w.db")
+    assert again.seed == 11 and again.start == gs_plain.world.start
+    for rid, room in gs_plain.world.rooms.items():
+        back = again.rooms[rid]
+        assert [i.name for i in back.items] == [i.name for i in room.items]
+        assert {d: e.locked for d, e in back.exits.items()} == {d: e.locked for d, e in room.exits.items()}
+        assert back.seen == room.seen
+
+
+def test_changes_to_an_evicted_room_survive_collection(tmp_path):
+    import gc
+
+    store = SQLiteRooms(tmp_path / "w.db", cache_size=1)
+    world = make_world(seed=11, n_rooms=15, store=store)
+    gs = GameState(world=world, room=world.rooms[world.start])
+    start = gs.room.id
+    for rid in list(store):
+        store[rid]  # push the player's room out of the LRU cache
+    assert start not in store.cache
+    name = next(it.name for it in gs.room.items if it.portable)
+    step(gs, f"take {name}")
+    gs.room = world.rooms[next(ex.to for ex in gs.room.exits.values())]
+    gs.history.clear()  # the undo journal holds the room too
+    gs.changes = None
+    gc.collect()
+    assert start not in store.live
+
+    back = world.rooms[start]
+    assert name not in [it.name for it in back.items]
+    assert [it.name for it in gs.inv] == [name]
@@ -0,0 +1,39 @@
+from dataclasses import asdict
+
+from adventure.engine.tags import VOCAB
+from adventure.engine.world import Item, Room
+
+
+def test_namespaces_and_values():
+    room = Room(id="r0", name="Vault", tags=["arch:vault", "theme:scifi", "cold"])
+    assert VOCAB.value(room.mask, "arch") == "vault"
+    assert VOCAB.value(room.mask, "theme") == "scifi"
+    assert VOCAB.value(room.mask, "key") is None
+    room.add_tag("arch:vault")
+    assert VOCAB.has(room.mask, "arch")
+
+
+def test_namespaces_of_items():
+    key = Item(name="rune key 1", tags=["key:rune1", "key"])
+    note = Item(name="scroll", tags=["note", "paper"])
+    relic = Item(name="sun shard", tags=["artifact:sun"])
+    assert [it for it in (key, note, relic) if VOCAB.has(it.mask, "key")] == [key]
+    assert [it for it in (key, note, relic) if VOCAB.has(it.mask, "note")] == [note]
+    assert VOCAB.tags_of(key.mask, "key") == ["key:rune1"]
+    assert VOCAB.namespace("goal:artifacts3") == "goal"
+
+
+def test_mask_is_not_serialized():
+    it = Item(name="sun shard", tags=["artifact:sun"])
+    data = asdict(it)
+    assert "mask" not in data
+    assert Item(**data).mask == it.mask
+
+
+def test_arch_follows_tag_order_not_interning_order():
+    from adventure.engine.describe import _get_arch
+
+    VOCAB.intern("arch:zz_promoted")  # interned first, so it has the lower id
+    room = Room(id="x", name="X", tags=["arch:zz_original", "arch:zz_promoted"])
+    assert _get_arch(room) == "zz_original"
+    assert VOCAB.value(room.mask, "arch", room.tags) == "zz_original"
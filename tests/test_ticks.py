@@ -0,0 +1,81 @@
+from adventure.engine import ticks
+from adventure.engine.loop import GameState, new_game
+from adventure.engine.ticks import FORWARD_HOPS, REGION, RELOCK_TURNS, TICK_EVENTS, Ticker
+from adventure.engine.world import Exit, Item, Room, World
+
+
+def _corridor(n, spacing=REGION * 3):
+    """Rooms r0..r{n-1} in a line east, `spacing` cells apart, a note in each."""
+    rooms = {f"r{i}": Room(id=f"r{i}", name=f"Hall {i}") for i in range(n)}
+    layout = {}
+    for i in range(n):
+        room = rooms[f"r{i}"]
+        room.items.append(Item(name="note", tags=["note"]))
+        if i:
+            room.exits["west"] = Exit(to=f"r{i - 1}")
+        if i < n - 1:
+            room.exits["east"] = Exit(to=f"r{i + 1}")
+        layout[room.id] = (i * spacing, 0, 0)
+    world = World(rooms=rooms, start="r0", seed=1, theme="fantasy", layout=layout)
+    gs = GameState(world=world, room=rooms["r0"])
+    gs.ticks = Ticker(world)
+    return gs
+
+
+def _notes(gs):
+    return {rid: len(r.items) for rid, r in gs.world.rooms.items()}
+
+
+def test_ticks_are_deterministic_and_notes_wander():
+    runs = []
+    for _ in range(2):
+        gs = new_game(seed=7, rooms=15, ticks=True)
+        before = _notes(gs)
+        runs.append((gs.apply(["look"] * 60), _notes(gs)))
+    assert runs[0] == runs[1]
+    assert runs[0][1] != before
+
+
+def test_far_regions_are_parked_then_fast_forwarded():
+    gs = _corridor(500)
+    fired = sum(TICK_EVENTS.values.values())
+    gs.apply(["look"] * 100)
+    # only the player's neighbourhood ran; every far event came due once and was parked
+    assert sum(TICK_EVENTS.values.values()) - fired < 100
+    assert len(gs.ticks.parked) > 400
+    assert all(_notes(gs)[f"r{i}"] == 1 for i in range(10, 500))
+
+    note = gs.world.rooms["r250"].items[0]
+    gs.room = gs.world.rooms["r250"]
+    fired = TICK_EVENTS.value("wander")
+    gs.apply("look")
+    # woken once, caught up with a bounded number of hops, and back on the heap
+    assert 0 < TICK_EVENTS.value("wander") - fired <= 3 * FORWARD_HOPS
+    ev = next(e for _, _, e in gs.ticks.heap if e.kind == "wander" and e.data[0] is note)
+    assert ev.due > gs.turns and abs(int(ev.data[1][1:]) - 250) <= FORWARD_HOPS
+
+
+def test_relock_needs_the_key_and_undoes():
+    gs = new_game(seed=2, rooms=12, ticks=True)
+    world = gs.world
+    rid, d = next((rid, d) for rid, r in world.rooms.items() for d, ex in r.exits.items()
+                  if ex.locked and ex.key_tag.startswith("key:"))
+    ex = world.rooms[rid].exits[d]
+    gs.room = world.rooms[rid]
+
+    ex.locked = False
+    gs.ticks.unlocked(rid, ex, gs.turns)
+    gs.apply(["look"] * RELOCK_TURNS)
+    assert not ex.locked  # no key held: the door stays open
+
+    gs.inv.append(Item(name="key", tags=[ex.key_tag, "key"]))
+    gs.ticks.unlocked(rid, ex, gs.turns)
+    out = gs.apply(["look"] * RELOCK_TURNS)
+    assert ex.locked and f"The way {d} swings shut and locks." in out[-1]
+    gs.undo()
+    assert not ex.locked
+
+
+def test_regions_group_layout_cells():
+    assert ticks.region_of((0, 0, 0)) == ticks.region_of((REGION - 1, REGION - 1, 0))
+    assert ticks.region_of((-1, 0, 0)) != ticks.region_of((0, 0, 0))
@@ -0,0 +1,48 @@
+import random
+from collections import deque
+
+from adventure.engine.loop import new_game
+from adventure.loadtest import GreedySolver, RandomWalker
+
+
+def _state(gs):
+    rooms = {
+        rid: (r.seen, [id(it) for it in r.items], {d: ex.locked for d, ex in r.exits.items()})
+        for rid, r in gs.world.rooms.items()
+    }
+    return (gs.room.id, gs.score, gs.turns, gs.map_pos, dict(gs.map_coords), [id(it) for it in gs.inv], rooms)
+
+
+def test_undo_restores_every_earlier_turn():
+    for seed, bot in ((1, GreedySolver), (2, RandomWalker), (3, GreedySolver)):
+        gs = new_game(seed=seed, rooms=12)
+        b = bot(random.Random(seed))
+        states = [_state(gs)]
+        for _ in range(40):
+            gs.apply(b.next_command(gs))
+            states.append(_state(gs))
+        assert gs.apply("undo 5")[0].startswith("Undone 5 turns.")
+        del states[-5:]
+        assert _state(gs) == states[-1]
+        for expected in reversed(states[:-1]):
+            assert gs.undo() == 1
+            assert _state(gs) == expected
+        assert gs.apply("undo")[0] == "Nothing to undo."
+
+
+def test_snapshot_rollback_and_limit():
+    gs = new_game(seed=4, rooms=10)
+    mark = gs.snapshot()
+    before = _state(gs)
+    gs.apply(["look", "take note", "n", "e"])
+    assert gs.rollback(mark) == 4 and _state(gs) == before
+
+    gs.history = deque(maxlen=2)
+    gs.apply(["look", "i", "look"])
+    assert gs.undo(5) == 2
+
+
+def test_undo_count_must_be_a_plain_number():
+    gs = new_game(seed=1, rooms=12)
+    gs.apply("look")
+    assert gs.apply("undo ²")[0] == gs.apply("undo x")[0] == "Undo how many turns?"